@@ -10,7 +10,8 @@ from trie import (
 
 
 def mk_random_bytes(n):
-    return bytes(bytearray([random.randint(0, 255) for _ in range(n)]))
+    # draw all the bits at once, still from the (seedable) random module
+    return random.getrandbits(8 * n).to_bytes(n, "big")
 
 
 TEST_DATA = {
@@ -1,6 +1,7 @@
 import pytest
 
 from hypothesis import (
+    HealthCheck,
     given,
     settings,
     strategies as st,
@@ -17,34 +18,63 @@ from trie.exceptions import (
 )
 
 
+@pytest.fixture(scope="module")
+def make_populated_trie():
+    """
+    Build each two-key trie only once per module, and hand out a fresh trie
+    on top of a copy of its database for every test case.
+    """
+    db_templates = {}
+
+    def _make_trie(kv1, kv2):
+        if (kv1, kv2) not in db_templates:
+            template_trie = BinaryTrie(db={})
+            template_trie.set(*kv1)
+            template_trie.set(*kv2)
+            db_templates[kv1, kv2] = (template_trie.db, template_trie.root_hash)
+
+        db_template, root_hash = db_templates[kv1, kv2]
+        return BinaryTrie(db=dict(db_template), root_hash=root_hash)
+
+    return _make_trie
+
+
 @given(
-    k=st.lists(
-        st.binary(min_size=32, max_size=32), min_size=100, max_size=100, unique=True
+    kv_pairs=st.lists(
+        st.tuples(st.binary(min_size=32, max_size=32), st.binary(min_size=1)),
+        min_size=100,
+        max_size=100,
+        unique_by=lambda kv: kv[0],
     ),
-    v=st.lists(st.binary(min_size=1), min_size=100, max_size=100),
-    random=st.randoms(use_true_random=True),
+    first_order=st.permutations(range(100)),
+    second_order=st.permutations(range(100)),
 )
-@settings(max_examples=10, deadline=1000)
-def test_bin_trie_different_order_insert(k, v, random):
-    kv_pairs = list(zip(k, v))
-    result = BLANK_HASH
-    # Repeat 3 times
-    for _ in range(3):
-        trie = BinaryTrie(db={})
-        random.shuffle(kv_pairs)
-        for _i, (k, v) in enumerate(kv_pairs):
-            trie.set(k, v)
-            assert trie.get(k) == v
-        assert result is BLANK_HASH or trie.root_hash == result
-        result = trie.root_hash
-        # insert already exist key/value
-        trie.set(kv_pairs[0][0], kv_pairs[0][1])
-        assert trie.root_hash == result
-        # Delete all key/value
-        random.shuffle(kv_pairs)
-        for k, _v in kv_pairs:
-            trie.delete(k)
-        assert trie.root_hash == BLANK_HASH
+@settings(
+    max_examples=50,
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow, HealthCheck.data_too_large],
+)
+def test_bin_trie_different_order_insert(kv_pairs, first_order, second_order):
+    trie = BinaryTrie(db={})
+    for index in first_order:
+        k, v = kv_pairs[index]
+        trie.set(k, v)
+        assert trie.get(k) == v
+    result = trie.root_hash
+    # insert already exist key/value
+    trie.set(*kv_pairs[0])
+    assert trie.root_hash == result
+
+    # Insertion order must not affect the root hash
+    other_trie = BinaryTrie(db={})
+    for index in second_order:
+        other_trie.set(*kv_pairs[index])
+    assert other_trie.root_hash == result
+
+    # Delete all key/value
+    for index in first_order:
+        other_trie.delete(kv_pairs[index][0])
+    assert other_trie.root_hash == BLANK_HASH
 
 
 @pytest.mark.parametrize(
@@ -81,12 +111,10 @@ def test_bin_trie_different_order_insert(k, v, random):
     ),
 )
 def test_bin_trie_delete_subtrie(
-    kv1, kv2, key_to_be_deleted, will_delete, will_rasie_error
+    make_populated_trie, kv1, kv2, key_to_be_deleted, will_delete, will_rasie_error
 ):
-    trie = BinaryTrie(db={})
     # First test case, delete subtrie of a kv node
-    trie.set(kv1[0], kv1[1])
-    trie.set(kv2[0], kv2[1])
+    trie = make_populated_trie(kv1, kv2)
     assert trie.get(kv1[0]) == kv1[1]
     assert trie.get(kv2[0]) == kv2[1]
 
@@ -117,10 +145,11 @@ def test_bin_trie_delete_subtrie(
         (b"\xab\xcd\xef", False),
     ),
 )
-def test_bin_trie_invalid_key(invalide_key, if_error):
-    trie = BinaryTrie(db={})
-    trie.set(b"\x12\x34\x56\x78", b"78")
-    trie.set(b"\x12\x34\x56\x79", b"79")
+def test_bin_trie_invalid_key(make_populated_trie, invalide_key, if_error):
+    trie = make_populated_trie(
+        (b"\x12\x34\x56\x78", b"78"),
+        (b"\x12\x34\x56\x79", b"79"),
+    )
 
     assert trie.get(invalide_key) is None
     if if_error:
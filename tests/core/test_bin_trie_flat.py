@@ -0,0 +1,158 @@
+import pytest
+
+from hypothesis import (
+    given,
+    settings,
+    strategies as st,
+)
+
+from trie.binary import (
+    BinaryTrie,
+)
+from trie.binary_flat import (
+    FlatBinaryTrie,
+)
+from trie.constants import (
+    BLANK_HASH,
+)
+from trie.exceptions import (
+    NodeOverrideError,
+    ValidationError,
+)
+
+
+@given(
+    kv_pairs=st.lists(
+        st.tuples(st.binary(min_size=1, max_size=4), st.binary(max_size=4)),
+        max_size=40,
+    ),
+)
+@settings(max_examples=200)
+def test_flat_bin_trie_matches_bin_trie(kv_pairs):
+    _assert_flat_bin_trie_matches_bin_trie(kv_pairs)
+
+
+@given(
+    kv_pairs=st.lists(
+        st.tuples(
+            # Build keys out of a few bytes, so that many keys are prefixes of others
+            st.lists(
+                st.sampled_from((b"\x00", b"\x01", b"\x80")), min_size=0, max_size=3
+            ).map(b"".join),
+            st.sampled_from((b"", b"value")),
+        ),
+        max_size=20,
+    ),
+)
+@settings(max_examples=200)
+def test_flat_bin_trie_matches_bin_trie_with_prefix_keys(kv_pairs):
+    _assert_flat_bin_trie_matches_bin_trie(kv_pairs)
+
+
+def _assert_flat_bin_trie_matches_bin_trie(kv_pairs):
+    trie = BinaryTrie(db={})
+    flat_trie = FlatBinaryTrie()
+
+    for key, value in kv_pairs:
+        try:
+            trie.set(key, value)
+        except (NodeOverrideError, ValidationError) as error:
+            with pytest.raises(type(error)):
+                flat_trie.set(key, value)
+        else:
+            flat_trie.set(key, value)
+            assert flat_trie.get(key) == trie.get(key)
+        assert flat_trie.root_hash == trie.root_hash
+
+
+@given(
+    keys=st.lists(
+        st.binary(min_size=32, max_size=32), min_size=1, max_size=100, unique=True
+    ),
+)
+@settings(max_examples=20)
+def test_flat_bin_trie_delete_all(keys):
+    trie = BinaryTrie(db={})
+    flat_trie = FlatBinaryTrie({key: b"value" for key in keys})
+    for key in keys:
+        trie.set(key, b"value")
+    assert flat_trie.root_hash == trie.root_hash
+
+    for key in keys:
+        del flat_trie[key]
+        assert key not in flat_trie
+    assert flat_trie.root_hash == BLANK_HASH
+
+
+@pytest.mark.parametrize(
+    "key_to_be_deleted,will_delete,will_raise_error",
+    (
+        (b"\x12\x34\x56", True, False),
+        (b"\x12\x34\x57", False, False),
+        (b"\x12\x34\x56\x78\x9a", False, True),
+    ),
+)
+def test_flat_bin_trie_delete_subtrie(key_to_be_deleted, will_delete, will_raise_error):
+    flat_trie = FlatBinaryTrie({b"\x12\x34\x56\x78": b"78", b"\x12\x34\x56\x79": b"79"})
+    root_hash_before_delete = flat_trie.root_hash
+
+    if will_raise_error:
+        with pytest.raises(NodeOverrideError):
+            flat_trie.delete_subtrie(key_to_be_deleted)
+    else:
+        flat_trie.delete_subtrie(key_to_be_deleted)
+        if will_delete:
+            assert flat_trie.root_hash == BLANK_HASH
+        else:
+            assert flat_trie.root_hash == root_hash_before_delete
+
+
+@pytest.mark.parametrize(
+    "existing_keys,exception",
+    (
+        ((), ValidationError),
+        ((b"\x12\x34",), NodeOverrideError),
+    ),
+)
+def test_flat_bin_trie_set_empty_key(existing_keys, exception):
+    trie = BinaryTrie(db={})
+    flat_trie = FlatBinaryTrie()
+    for key in existing_keys:
+        trie.set(key, b"value")
+        flat_trie.set(key, b"value")
+
+    with pytest.raises(exception):
+        trie.set(b"", b"value")
+    with pytest.raises(exception):
+        flat_trie.set(b"", b"value")
+
+
+def test_flat_bin_trie_delete_key_ending_at_kv_node():
+    # The keys branch at bit 7, so the kv node leading to b"\x01\x00" starts at bit 8
+    flat_trie = FlatBinaryTrie({b"\x00\x01": b"01", b"\x01\x00": b"00"})
+
+    with pytest.raises(NodeOverrideError):
+        flat_trie.delete(b"\x01")
+
+
+@pytest.mark.parametrize(
+    "invalid_key,if_error",
+    (
+        (b"\x12\x34\x56", False),
+        (b"\x12\x34\x56\x77", False),
+        (b"\x12\x34\x56\x78\x9a", True),
+        (b"\x12\x34\x56\x79\xab", True),
+        (b"\xab\xcd\xef", False),
+    ),
+)
+def test_flat_bin_trie_invalid_key(invalid_key, if_error):
+    flat_trie = FlatBinaryTrie({b"\x12\x34\x56\x78": b"78", b"\x12\x34\x56\x79": b"79"})
+
+    assert flat_trie.get(invalid_key) is None
+    if if_error:
+        with pytest.raises(NodeOverrideError):
+            flat_trie.delete(invalid_key)
+    else:
+        previous_root_hash = flat_trie.root_hash
+        flat_trie.delete(invalid_key)
+        assert previous_root_hash == flat_trie.root_hash
@@ -1,5 +1,8 @@
+import pytest
+
 from hypothesis import (
     given,
+    settings,
     strategies as st,
 )
 
@@ -10,10 +13,16 @@ from trie.utils.binaries import (
     encode_to_bin,
 )
 
+BITS_TO_BIN_TABLE = bytes.maketrans(b"01", b"\x00\x01")
+
 
-@given(value=st.binary(min_size=0, max_size=1024))
+@given(value=st.binary(min_size=0, max_size=8192))
+@settings(max_examples=200)
 def test_round_trip_bin_encoding(value):
     value_as_binaries = encode_to_bin(value)
+    # The leading 0x01 keeps bin() from dropping the leading zero bits of value
+    expected_bits = bin(int.from_bytes(b"\x01" + value, "big"))[3:]
+    assert value_as_binaries == expected_bits.encode().translate(BITS_TO_BIN_TABLE)
     result = decode_from_bin(value_as_binaries)
     assert result == value
 
@@ -21,5 +30,19 @@ def test_round_trip_bin_encoding(value):
 @given(value=st.lists(elements=st.integers(0, 1), min_size=0, max_size=1024))
 def test_round_trip_bin_keypath_encoding(value):
     value_as_bin_keypath = encode_from_bin_keypath(bytes(value))
+    assert encode_from_bin_keypath(value) == value_as_bin_keypath
     result = decode_to_bin_keypath(value_as_bin_keypath)
     assert result == bytes(value)
+
+
+@pytest.mark.parametrize(
+    "input_bin,expected",
+    (
+        (b"", b""),
+        (bytes([0, 1, 0, 0, 0, 0, 0, 1]), b"A"),
+        (bytes([1, 0, 1]), b"\x05"),
+        (bytes([0, 1, 0, 0, 0, 0, 0, 1, 1, 1]), b"A\x03"),
+    ),
+)
+def test_decode_from_bin_partial_byte(input_bin, expected):
+    assert decode_from_bin(input_bin) == expected
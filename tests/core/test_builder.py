@@ -0,0 +1,31 @@
+from hypothesis import (
+    given,
+    settings,
+    strategies as st,
+)
+
+from trie.tools.builder import (
+    trie_from_keys,
+    trie_from_keys_batch,
+)
+from trie.tools.strategies import (
+    trie_keys_with_extensions,
+)
+
+
+@given(
+    trie_keys_with_extensions(),
+    st.integers(min_value=0, max_value=32),
+    st.booleans(),
+)
+@settings(max_examples=200)
+def test_trie_from_keys_batch_matches_inserts(trie_keys, minimum_value_length, prune):
+    expected_db, expected_trie = trie_from_keys(trie_keys, minimum_value_length, prune)
+    node_db, trie = trie_from_keys_batch(trie_keys, minimum_value_length, prune)
+
+    assert trie.root_hash == expected_trie.root_hash
+    assert node_db == expected_db
+    if prune:
+        assert trie.ref_count == expected_trie.ref_count
+    for key in trie_keys:
+        assert trie[key] == expected_trie[key]
@@ -15,6 +15,12 @@ from trie.utils.nodes import (
     compute_leaf_key,
 )
 
+SOME_NODE_KEY = (1, 2)
+SOME_NODE_BY_KEY_ENCODING = {
+    key_encoding: annotate_node([key_encoding(SOME_NODE_KEY), b"random-value"])
+    for key_encoding in (compute_extension_key, compute_leaf_key)
+}
+
 
 @pytest.mark.parametrize(
     "valid_prefix",
@@ -93,9 +99,8 @@ def test_invalid_MissingTraversalNode_nibbles(invalid_nibbles, exception):
 )
 @pytest.mark.parametrize("key_encoding", (compute_extension_key, compute_leaf_key))
 def test_valid_TraversedPartialPath_traversed_nibbles(valid_nibbles, key_encoding):
-    some_node_key = (1, 2)
-    node = annotate_node([key_encoding(some_node_key), b"random-value"])
-    exception = TraversedPartialPath(valid_nibbles, node, some_node_key[:1])
+    node = SOME_NODE_BY_KEY_ENCODING[key_encoding]
+    exception = TraversedPartialPath(valid_nibbles, node, SOME_NODE_KEY[:1])
     assert exception.nibbles_traversed == valid_nibbles
     assert str(Nibbles(valid_nibbles)) in repr(exception)
 
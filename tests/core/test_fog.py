@@ -5,6 +5,7 @@ from eth_utils import (
 )
 from hypothesis import (
     given,
+    settings,
     strategies as st,
 )
 
@@ -17,8 +18,14 @@ from trie.fog import (
 )
 
 
-def test_trie_fog_completion():
-    fog = HexaryTrieFog()
+@pytest.fixture(scope="module")
+def empty_fog():
+    # HexaryTrieFog is immutable, so all tests can share one starting fog
+    return HexaryTrieFog()
+
+
+def test_trie_fog_completion(empty_fog):
+    fog = empty_fog
 
     # fog should start with *nothing* verified
     assert not fog.is_complete
@@ -32,8 +39,18 @@ def test_trie_fog_completion():
     assert not fog.is_complete
 
 
-def test_trie_fog_expand_before_complete():
-    fog = HexaryTrieFog()
+def test_trie_fog_empty_is_shared_and_unchanged():
+    empty_fog = HexaryTrieFog.EMPTY
+    assert empty_fog == HexaryTrieFog()
+    assert not empty_fog.is_complete
+
+    explored_fog = empty_fog.explore((), ((1,),))
+    assert explored_fog is not empty_fog
+    assert HexaryTrieFog.EMPTY.nearest_unknown((1,)) == ()
+
+
+def test_trie_fog_expand_before_complete(empty_fog):
+    fog = empty_fog
 
     empty_prefix = ()
     branched = fog.explore(empty_prefix, ((1,), (5,)))
@@ -47,8 +64,8 @@ def test_trie_fog_expand_before_complete():
     assert completed.is_complete
 
 
-def test_trie_fog_expand_before_mark_all_complete():
-    fog = HexaryTrieFog()
+def test_trie_fog_expand_before_mark_all_complete(empty_fog):
+    fog = empty_fog
 
     empty_prefix = ()
     branched = fog.explore(empty_prefix, ((1,), (5,)))
@@ -59,8 +76,34 @@ def test_trie_fog_expand_before_mark_all_complete():
     assert completed.is_complete
 
 
-def test_trie_fog_composition_equality():
-    fog = HexaryTrieFog()
+def test_trie_fog_mark_some_complete(empty_fog):
+    fog = empty_fog
+
+    branched = fog.explore((), ((1,), (3,), (5,), (7,)))
+    partially_completed = branched.mark_all_complete(((5,), (1,)))
+
+    expected = branched.explore((1,), ()).explore((5,), ())
+    assert partially_completed == expected
+    assert partially_completed.nearest_unknown((1,)) == (3,)
+    assert partially_completed.nearest_right((6,)) == (7,)
+
+
+@pytest.mark.parametrize(
+    "complete_prefixes",
+    (
+        ((2,),),
+        ((1,), (1,)),
+        ((1, 1),),
+    ),
+)
+def test_trie_fog_mark_all_complete_invalid(complete_prefixes, empty_fog):
+    fog = empty_fog.explore((), ((1,), (5,)))
+    with pytest.raises(ValidationError):
+        fog.mark_all_complete(complete_prefixes)
+
+
+def test_trie_fog_composition_equality(empty_fog):
+    fog = empty_fog
 
     empty_prefix = ()
     single_exploration = fog.explore(empty_prefix, ((9, 9, 9),))
@@ -69,10 +112,12 @@ def test_trie_fog_composition_equality():
     full_explore = half_explore.explore((9,), ((9, 9),))
 
     assert single_exploration == full_explore
+    assert hash(single_exploration) == hash(full_explore)
+    assert len({fog, single_exploration, full_explore}) == 2
 
 
-def test_trie_fog_immutability():
-    fog = HexaryTrieFog()
+def test_trie_fog_immutability(empty_fog):
+    fog = empty_fog
 
     fog1 = fog.explore((), ((1,), (2,)))
 
@@ -94,18 +139,18 @@ def test_trie_fog_immutability():
         [(1, 2), (1, 2)],
     ),
 )
-def test_trie_fog_explore_invalid(sub_segments):
+def test_trie_fog_explore_invalid(sub_segments, empty_fog):
     """
     Cannot explore with a sub_segment that is a child of another sub_segment,
     or a duplicate
     """
-    fog = HexaryTrieFog()
+    fog = empty_fog
     with pytest.raises(ValidationError):
         fog.explore((), sub_segments)
 
 
-def test_trie_fog_nearest_unknown():
-    fog = HexaryTrieFog()
+def test_trie_fog_nearest_unknown(empty_fog):
+    fog = empty_fog
 
     empty_prefix = ()
     assert fog.nearest_unknown((1, 2, 3)) == empty_prefix
@@ -139,8 +184,8 @@ def test_trie_fog_nearest_unknown():
     assert branched.nearest_unknown((6, 1, 1)) == (5, 5)
 
 
-def test_trie_fog_nearest_unknown_fully_explored():
-    fog = HexaryTrieFog()
+def test_trie_fog_nearest_unknown_fully_explored(empty_fog):
+    fog = empty_fog
     empty_prefix = ()
     fully_explored = fog.explore(empty_prefix, ())
 
@@ -151,8 +196,8 @@ def test_trie_fog_nearest_unknown_fully_explored():
         fully_explored.nearest_unknown((0,))
 
 
-def test_trie_fog_nearest_right():
-    fog = HexaryTrieFog()
+def test_trie_fog_nearest_right(empty_fog):
+    fog = empty_fog
 
     empty_prefix = ()
     assert fog.nearest_right((1, 2, 3)) == empty_prefix
@@ -192,8 +237,8 @@ def test_trie_fog_nearest_right():
         assert branched.nearest_right((6, 0, 0))
 
 
-def test_trie_fog_nearest_right_empty():
-    fog = HexaryTrieFog()
+def test_trie_fog_nearest_right_empty(empty_fog):
+    fog = empty_fog
     empty_prefix = ()
     fully_explored = fog.explore(empty_prefix, ())
 
@@ -204,12 +249,30 @@ def test_trie_fog_nearest_right_empty():
         fully_explored.nearest_right((0,))
 
 
+NIBBLE_STRATEGY = st.sampled_from(tuple(range(16)))
+
+
+def test_trie_fog_repeated_nearest_lookups(empty_fog):
+    fog = empty_fog.explore((), ((1,), (5,)))
+
+    for _ in range(2):
+        assert fog.nearest_unknown((2,)) == (1,)
+        assert fog.nearest_right([2]) == (5,)
+        with pytest.raises(FullDirectionalVisibility):
+            fog.nearest_right((6,))
+
+    # answers remembered by the original fog must not leak into explored fogs
+    explored_fog = fog.explore((1,), ())
+    assert explored_fog.nearest_unknown((2,)) == (5,)
+    assert fog.nearest_unknown((2,)) == (1,)
+
+
 @given(
     st.lists(
         st.tuples(
             # next index to use to search for a prefix to expand
             st.lists(
-                st.integers(min_value=0, max_value=0xF),
+                NIBBLE_STRATEGY,
                 max_size=4
                 * 2,  # one byte (two nibbles) deeper than the longest key above
             ),
@@ -217,24 +280,24 @@ def test_trie_fog_nearest_right_empty():
             st.one_of(
                 # branch node (or leaf node if size == 0)
                 st.lists(
-                    st.tuples(
-                        st.integers(min_value=0, max_value=0xF),
-                    ),
+                    st.tuples(NIBBLE_STRATEGY),
                     max_size=16,
                     unique=True,
                 ),
                 # or extension node
                 st.tuples(
                     st.lists(
-                        st.integers(min_value=0, max_value=0xF),
+                        NIBBLE_STRATEGY,
                         min_size=2,
                     ),
                 ),
             ),
         ),
+        max_size=50,
     ),
 )
-def test_trie_fog_serialize(expand_points):
+@settings(max_examples=200, deadline=None)
+def test_trie_fog_serialize(empty_fog, expand_points):
     """
     Build a bunch of random trie fogs, serialize them to a bytes representation,
     then deserialize them back.
@@ -242,7 +305,7 @@ def test_trie_fog_serialize(expand_points):
     Validate that all deserialized tries are equal to their starting tries and
     respond to nearest_unknown the same as the original.
     """
-    starting_fog = HexaryTrieFog()
+    starting_fog = empty_fog
     for next_index, children in expand_points:
         try:
             next_unknown = starting_fog.nearest_unknown(next_index)
@@ -253,9 +316,9 @@ def test_trie_fog_serialize(expand_points):
         starting_fog = starting_fog.explore(next_unknown, children)
 
     if expand_points:
-        assert starting_fog != HexaryTrieFog()
+        assert starting_fog != empty_fog
     else:
-        assert starting_fog == HexaryTrieFog()
+        assert starting_fog == empty_fog
 
     resumed_fog = HexaryTrieFog.deserialize(starting_fog.serialize())
     assert resumed_fog == starting_fog
@@ -1,11 +1,18 @@
 from collections import (
+    Counter,
     defaultdict,
 )
-import fnmatch
+from collections.abc import (
+    MutableMapping,
+)
+import copy
 import itertools
 import json
+import math
 import os
+import pathlib
 import pytest
+import random
 
 from eth_utils import (
     decode_hex,
@@ -40,6 +47,9 @@ from trie.utils.nodes import (
 
 
 def normalize_fixture(fixture):
+    raw_in = fixture["in"]
+    # fixtures list their updates either as a mapping or as a list of pairs
+    in_items = raw_in.items() if isinstance(raw_in, dict) else raw_in
     normalized_fixture = {
         "in": tuple(
             (
@@ -52,11 +62,7 @@ def normalize_fixture(fixture):
                 if value is not None
                 else None,
             )
-            for key, value in (
-                fixture["in"].items()
-                if isinstance(fixture["in"], dict)
-                else fixture["in"]
-            )
+            for key, value in in_items
         ),
         "root": decode_hex(fixture["root"]),
     }
@@ -68,10 +74,8 @@ ROOT_PROJECT_DIR = os.path.dirname(TESTS_DIR)
 
 
 def recursive_find_files(base_dir, pattern):
-    for dirpath, _, filenames in os.walk(base_dir):
-        for filename in filenames:
-            if fnmatch.fnmatch(filename, pattern):
-                yield os.path.join(dirpath, filename)
+    # sorted, so that fixtures are always collected in the same order
+    return sorted(str(path) for path in pathlib.Path(base_dir).rglob(pattern))
 
 
 BASE_FIXTURE_PATH = os.path.join(ROOT_PROJECT_DIR, "fixtures", "TrieTests")
@@ -85,32 +89,62 @@ def test_fixtures_exist():
     assert FIXTURES_PATHS
 
 
-RAW_FIXTURES = tuple(
-    (
-        os.path.basename(fixture_path),
-        json.load(open(fixture_path)),
-    )
-    for fixture_path in FIXTURES_PATHS
-)
+def load_raw_fixtures():
+    raw_fixtures = []
+    for fixture_path in FIXTURES_PATHS:
+        with open(fixture_path, "rb") as fixture_file:
+            raw_fixtures.append(
+                (os.path.basename(fixture_path), json.loads(fixture_file.read()))
+            )
+    return tuple(raw_fixtures)
 
 
-FIXTURES_NORMALIZED = tuple(
-    (
-        f"{fixture_filename}:{key}",
-        normalize_fixture(fixtures[key]),
+def load_normalized_fixtures():
+    return tuple(
+        (
+            f"{fixture_filename}:{key}",
+            normalize_fixture(fixtures[key]),
+        )
+        for fixture_filename, fixtures in load_raw_fixtures()
+        for key in sorted(fixtures.keys())
     )
-    for fixture_filename, fixtures in RAW_FIXTURES
-    for key in sorted(fixtures.keys())
-)
 
 
 def get_expected_results(fixture):
     keys_and_values = fixture["in"]
-    deletes = tuple(k for k, v in keys_and_values if v is None)
-    remaining = {k: v for k, v in keys_and_values if k not in deletes}
+    # dict.fromkeys drops repeated deletes of a key, but keeps the order
+    deletes = tuple(dict.fromkeys(k for k, v in keys_and_values if v is None))
+    deleted_keys = set(deletes)
+    remaining = {k: v for k, v in keys_and_values if k not in deleted_keys}
     return remaining, deletes
 
 
+def sample_permutations(seed, values, max_permutations):
+    """
+    Get up to max_permutations distinct orderings of values, starting with the
+    original order. When there are more orderings than that, pick them at random
+    (but deterministically) instead of taking the first ones, which only shuffle
+    the tail of the sequence.
+    """
+    if math.factorial(len(values)) <= max_permutations:
+        # dict keeps the first-seen order, and drops orderings that only swap
+        #   repeated entries
+        return tuple(dict.fromkeys(itertools.permutations(values)))
+
+    # Swapping repeated entries doesn't make a new ordering, so count the orderings
+    #   of the multiset, or the loop below would never finish
+    distinct_orderings = math.factorial(len(values))
+    for count in Counter(values).values():
+        distinct_orderings //= math.factorial(count)
+
+    rng = random.Random(seed)
+    # dict keeps the first-seen order, so test ids are stable across xdist workers
+    unique_orderings = {tuple(values): None}
+    while len(unique_orderings) < min(max_permutations, distinct_orderings):
+        unique_orderings[tuple(rng.sample(values, len(values)))] = None
+    return tuple(unique_orderings)
+
+
 def permute_fixtures(fixtures):
     for fixture_name, fixture in fixtures:
         final_mapping, deleted_keys = get_expected_results(fixture)
@@ -120,14 +154,12 @@ def permute_fixtures(fixtures):
         # that are not deleted in the final state cannot be permuted since the updates
         # must be applied in order.
         updates = fixture["in"]
-        all_keys = sorted(entry[0] for entry in updates)
-        duplicate_keys = sorted({key for key in all_keys if all_keys.count(key) > 1})
+        key_counts = Counter(entry[0] for entry in updates)
+        duplicate_keys = [key for key, count in key_counts.items() if count > 1]
         if duplicate_keys and not all(key in deleted_keys for key in duplicate_keys):
             yield (fixture_name, updates, final_mapping, deleted_keys, final_root)
         else:
-            for update_series in itertools.islice(
-                itertools.permutations(fixture["in"]), 100
-            ):
+            for update_series in sample_permutations(fixture_name, updates, 100):
                 yield (
                     fixture_name,
                     update_series,
@@ -137,12 +169,20 @@ def permute_fixtures(fixtures):
                 )
 
 
-FIXTURES_PERMUTED = tuple(permute_fixtures(FIXTURES_NORMALIZED))
+FIXTURES_PERMUTED = tuple(permute_fixtures(load_normalized_fixtures()))
 
 
 def trim_long_bytes(param):
     if isinstance(param, bytes) and len(param) > 3:
-        return repr("0x" + param[:3].hex() + "...")
+        return f"'0x{param[:3].hex()}...'"
+
+
+# Every test that replays the fixtures shares this one parametrization
+with_permuted_fixtures = pytest.mark.parametrize(
+    "name, updates, expected, deleted, final_root",
+    FIXTURES_PERMUTED,
+    ids=trim_long_bytes,
+)
 
 
 def assert_proof(trie, key):
@@ -152,11 +192,7 @@ def assert_proof(trie, key):
     assert proof_value == trie.get(key)
 
 
-@pytest.mark.parametrize(
-    "name, updates, expected, deleted, final_root",
-    FIXTURES_PERMUTED,
-    ids=trim_long_bytes,
-)
+@with_permuted_fixtures
 def test_trie_using_fixtures(name, updates, expected, deleted, final_root):
     trie = HexaryTrie(db={})
 
@@ -170,36 +206,68 @@ def test_trie_using_fixtures(name, updates, expected, deleted, final_root):
     for key in deleted:
         del trie[key]
 
-    for key, expected_value in expected.items():
-        assert key in trie
-        actual_value = trie[key]
-        assert actual_value == expected_value
-
-    for key in deleted:
-        assert key not in trie
-
     actual_root = trie.root_hash
     assert actual_root == final_root
 
-    for valid_proof_key in expected:
-        assert_proof(trie, valid_proof_key)
+    # check the presence of the expected keys and the absence of the deleted ones,
+    # and prove each of them in the same pass
+    checked_keys = tuple(expected) + tuple(deleted)
+    for key, proof in zip(checked_keys, trie.get_proofs(checked_keys)):
+        if key in expected:
+            # expected values are never blank, so this also checks that the key exists
+            expected_value = expected[key]
+            assert trie[key] == expected_value
+        else:
+            expected_value = b""
+            assert key not in trie
 
-    for absence_proof_key in deleted:
-        assert_proof(trie, absence_proof_key)
+        proof_value = HexaryTrie.get_from_proof(trie.root_hash, key, proof)
+        assert proof_value == expected_value
 
 
-class KeyAccessLogger(dict):
+class KeyAccessLogger(MutableMapping):
+    """
+    A database that records which keys were read. Wraps a plain dict instead of
+    subclassing it, so that every way of reading a value (like get()) is logged.
+    """
+
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+        self._db = dict(*args, **kwargs)
         self.read_keys = set()
 
     def __getitem__(self, key):
-        result = super().__getitem__(key)
+        result = self._db[key]
         self.read_keys.add(key)
         return result
 
+    def __setitem__(self, key, value):
+        self._db[key] = value
+
+    def __delitem__(self, key):
+        del self._db[key]
+
+    def __contains__(self, key):
+        # Checking for presence is not a read
+        return key in self._db
+
+    def __iter__(self):
+        return iter(self._db)
+
+    def __len__(self):
+        return len(self._db)
+
     def unread_keys(self):
-        return self.keys() - self.read_keys
+        return self._db.keys() - self.read_keys
+
+
+def test_sample_permutations_with_repeated_entries():
+    # a deleted key can appear twice, so only 5! / 2! = 60 of the orderings differ
+    values = ((b"a", None), (b"a", None), (b"b", b"1"), (b"c", b"2"), (b"d", b"3"))
+    orderings = sample_permutations("repeated", values, 100)
+
+    assert len(orderings) == 60
+    assert orderings[0] == values
+    assert all(Counter(ordering) == Counter(values) for ordering in orderings)
 
 
 def test_hexary_trie_saves_each_root():
@@ -241,29 +309,29 @@ def test_hexary_trie_at_root_lookups():
     )
 
     # track which key is expected to be present in which root
-    expected_by_root = defaultdict(set)
-    missing_by_root = defaultdict(set)
+    expected_by_root = defaultdict(list)
+    missing_by_root = defaultdict(list)
 
     trie = HexaryTrie({})
     for key, val in changes:
         if val is None:
             del trie[key]
-            missing_by_root[trie.root_hash].add(key)
+            missing_by_root[trie.root_hash].append(key)
         else:
             trie[key] = val
-            expected_by_root[trie.root_hash].add((key, val))
+            expected_by_root[trie.root_hash].append((key, val))
 
     # check that the values are still reachable at the old state roots
     for root_hash, expected_items in expected_by_root.items():
-        for key, val in expected_items:
-            with trie.at_root(root_hash) as snapshot:
+        with trie.at_root(root_hash) as snapshot:
+            for key, val in expected_items:
                 assert key in snapshot
                 assert snapshot[key] == val
 
     # check that missing values are not reachable at the old state roots
     for root_hash, missing_keys in missing_by_root.items():
-        for key in missing_keys:
-            with trie.at_root(root_hash) as snapshot:
+        with trie.at_root(root_hash) as snapshot:
+            for key in missing_keys:
                 assert key not in snapshot
 
 
@@ -326,6 +394,8 @@ def trie_updates_strategy(draw, max_size=256):
     minimum_insert_value_length = draw(st.integers(min_value=3, max_value=32))
 
     latest_keys = list(start_keys)
+    # Track where each key is in latest_keys, for fast membership checks and removal
+    latest_key_indices = {key: index for index, key in enumerate(latest_keys)}
     inserts = [
         (key, key.ljust(minimum_insert_value_length, b"3")) for key in start_keys
     ]
@@ -366,18 +436,25 @@ def trie_updates_strategy(draw, max_size=256):
 
         if len(next_change) == 1:
             key = next_change[0]
-            if key in latest_keys:
+            if key in latest_key_indices:
                 # Inserting an existing key is not allowed (it would actually be an
                 # update), so treat it as a no-op.
                 continue
             else:
+                latest_key_indices[key] = len(latest_keys)
                 latest_keys.append(key)
                 updates.append((key, key.ljust(minimum_insert_value_length, b"3")))
         elif len(next_change) == 2:
             updates.append(next_change)
             key, next_val = next_change
             if next_val in (None, b""):
-                latest_keys.remove(key)
+                # Swap the last key into the deleted key's slot, instead of shifting
+                # every following key down
+                index = latest_key_indices.pop(key)
+                last_key = latest_keys.pop()
+                if last_key != key:
+                    latest_keys[index] = last_key
+                    latest_key_indices[last_key] = index
         else:
             raise Exception(f"Invalid code path: next_change = {next_change}")
 
@@ -439,7 +516,9 @@ def test_squash_changes_does_not_prune_on_missing_trie_node(inserts_and_updates)
                 # Catch any missing nodes during trie change, and fix them up.
                 # This is equivalent to Trinity's "Beam Sync".
 
-                previous_db = trie_batch.db.copy()
+                # The batch only ever writes to its scratch cache, so snapshotting
+                # the cache is enough to tell whether the database was changed.
+                previous_changes = dict(trie_batch.db.cache)
                 try:
                     if value is None:
                         del trie_batch[key]
@@ -447,8 +526,7 @@ def test_squash_changes_does_not_prune_on_missing_trie_node(inserts_and_updates)
                         trie_batch[key] = value
                 except MissingTrieNode as exc:
                     # When an exception is raised, we must never change the database
-                    current_db = trie_batch.db.copy()
-                    assert current_db == previous_db
+                    assert trie_batch.db.cache == previous_changes
 
                     node_db[exc.missing_node_hash] = missing_nodes.pop(
                         exc.missing_node_hash
@@ -544,11 +622,7 @@ def test_hexary_trie_squash_all_changes(updates, deleted):
     assert final_root_hash == verbose_trie.root_hash
 
 
-@pytest.mark.parametrize(
-    "name, updates, expected, deleted, final_root",
-    FIXTURES_PERMUTED,
-    ids=trim_long_bytes,
-)
+@with_permuted_fixtures
 def test_hexary_trie_saving_final_root(name, updates, expected, deleted, final_root):
     db = {}
     trie = HexaryTrie(db=db)
@@ -594,10 +668,25 @@ def test_hexary_trie_batch_save_keeps_last_root_data():
     assert old_trie[b"what floats on water?"] == b"very small rocks"
 
 
-def test_hexary_trie_batch_save_drops_last_root_data_when_pruning():
-    db = {}
-    trie = HexaryTrie(db, prune=True)
+@pytest.fixture(scope="module")
+def _rocks_pruning_trie():
+    trie = HexaryTrie({}, prune=True)
     trie.set(b"what floats on water?", b"very small rocks")
+    return trie
+
+
+@pytest.fixture
+def rocks_pruning_trie(_rocks_pruning_trie):
+    """
+    Build the single-key pruning trie only once per module, and hand out a deep
+    copy of it (database and reference counts included) to every test.
+    """
+    return copy.deepcopy(_rocks_pruning_trie)
+
+
+def test_hexary_trie_batch_save_drops_last_root_data_when_pruning(rocks_pruning_trie):
+    trie = rocks_pruning_trie
+    db = trie.db
     old_root_hash = trie.root_hash
 
     with trie.squash_changes() as memory_trie:
@@ -613,10 +702,8 @@ def test_hexary_trie_batch_save_drops_last_root_data_when_pruning():
     assert encode_hex(old_root_hash) in str(excinfo.value)
 
 
-def test_squash_changes_can_still_access_underlying_deleted_data():
-    db = {}
-    trie = HexaryTrie(db, prune=True)
-    trie.set(b"what floats on water?", b"very small rocks")
+def test_squash_changes_can_still_access_underlying_deleted_data(rocks_pruning_trie):
+    trie = rocks_pruning_trie
     old_root_hash = trie.root_hash
 
     with trie.squash_changes() as memory_trie:
@@ -630,10 +717,8 @@ def test_squash_changes_can_still_access_underlying_deleted_data():
         assert memory_trie[b"what floats on water?"] == b"very small rocks"
 
 
-def test_squash_changes_raises_correct_error_on_new_deleted_data():
-    db = {}
-    trie = HexaryTrie(db, prune=True)
-    trie.set(b"what floats on water?", b"very small rocks")
+def test_squash_changes_raises_correct_error_on_new_deleted_data(rocks_pruning_trie):
+    trie = rocks_pruning_trie
 
     with trie.squash_changes() as memory_trie:
         memory_trie.set(b"what floats on water?", b"a duck")
@@ -651,10 +736,11 @@ def test_squash_changes_raises_correct_error_on_new_deleted_data():
             memory_trie[b"what floats on water?"]
 
 
-def test_squash_changes_raises_correct_error_on_underlying_missing_data():
-    db = {}
-    trie = HexaryTrie(db, prune=True)
-    trie.set(b"what floats on water?", b"very small rocks")
+def test_squash_changes_raises_correct_error_on_underlying_missing_data(
+    rocks_pruning_trie,
+):
+    trie = rocks_pruning_trie
+    db = trie.db
     old_root_hash = trie.root_hash
 
     # what if the root node hash is missing from the beginning?
@@ -853,11 +939,7 @@ def verify_ref_count(trie):
         assert actual_num == expected_num
 
 
-@pytest.mark.parametrize(
-    "name, updates, expected, deleted, final_root",
-    FIXTURES_PERMUTED,
-    ids=trim_long_bytes,
-)
+@with_permuted_fixtures
 def test_hexary_trie_ref_count(name, updates, expected, deleted, final_root):
     db = {}
     trie = HexaryTrie(db=db)
@@ -879,29 +961,22 @@ def test_hexary_trie_avoid_over_pruning():
     db = {}
     trie = HexaryTrie(db, prune=True)
 
-    def _insert(trie, index, val):
-        index_key = rlp.encode(index, sedes=rlp.sedes.big_endian_int)
-        trie[index_key] = val
-        return index_key
-
-    inserted_keys = []
-    for index, val in enumerate([b"\0" * 32] * 129):
-        new_key = _insert(trie, index, val)
-        inserted_keys.append(new_key)
-
-        # poke the trie to make sure all nodes are still present
-        for key in inserted_keys:
-            # If there's a problem, this will raise a MissingTrieNode
-            trie.get(key)
+    index_keys = [
+        rlp.encode(index, sedes=rlp.sedes.big_endian_int) for index in range(129)
+    ]
+    for index_key in index_keys:
+        trie[index_key] = b"\0" * 32
 
+        # Regenerating the ref count reads every node reachable from the root, so it
+        # also makes sure that no node still in use was pruned. If one was, this will
+        # raise a KeyError.
         verify_ref_count(trie)
 
+    for index_key in index_keys:
+        assert trie[index_key] == b"\0" * 32
 
-@pytest.mark.parametrize(
-    "name, updates, expected, deleted, final_root",
-    FIXTURES_PERMUTED,
-    ids=trim_long_bytes,
-)
+
+@with_permuted_fixtures
 def test_hexary_trie_traverse(name, updates, expected, deleted, final_root):
     # Create trie with fixture data
     db = {}
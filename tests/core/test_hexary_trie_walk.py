@@ -1,3 +1,7 @@
+from collections import (
+    defaultdict,
+)
+import functools
 import pytest
 
 from hypothesis import (
@@ -7,6 +11,9 @@ from hypothesis import (
     strategies as st,
 )
 
+from trie import (
+    HexaryTrie,
+)
 from trie.exceptions import (
     MissingTraversalNode,
     MissingTrieNode,
@@ -21,7 +28,7 @@ from trie.iter import (
     NodeIterator,
 )
 from trie.tools.builder import (
-    trie_from_keys,
+    trie_from_keys_batch,
 )
 from trie.tools.strategies import (
     trie_keys_with_extensions,
@@ -29,6 +36,37 @@ from trie.tools.strategies import (
 from trie.typing import (
     Nibbles,
 )
+from trie.utils.nibbles import (
+    nibbles_to_bytes,
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _build_pruning_trie(trie_keys, minimum_value_length):
+    node_db, trie = trie_from_keys_batch(trie_keys, minimum_value_length, prune=True)
+    return tuple(node_db.items()), trie.root_hash, tuple(trie.ref_count.items())
+
+
+def pruning_trie_without_nodes(trie_keys, minimum_value_length):
+    """
+    Like trie_from_keys(..., prune=True), but with every node body dropped from the
+    database. The trie is built with trie_from_keys_batch, which makes the same
+    database, and only once per distinct trie: Hypothesis often replays the same keys
+    while generating and shrinking examples.
+
+    :return: the (empty) database, the trie on top of it, and all the dropped nodes
+    """
+    db_items, root_hash, ref_count_items = _build_pruning_trie(
+        tuple(trie_keys), minimum_value_length
+    )
+    node_db = {}
+    trie = HexaryTrie(
+        node_db,
+        root_hash=root_hash,
+        prune=True,
+        ref_count=defaultdict(int, ref_count_items),
+    )
+    return node_db, trie, dict(db_items)
 
 
 @given(
@@ -50,16 +88,16 @@ def test_trie_walk_backfilling(trie_keys, minimum_value_length, index_nibbles):
     - Every time a node is missing from the DB, replace it and retry
     - Repeat until full trie has been explored with the HexaryTrieFog
     """
-    node_db, trie = trie_from_keys(trie_keys, minimum_value_length, prune=True)
+    # start with all nodes deleted
+    node_db, trie, dropped_nodes = pruning_trie_without_nodes(
+        trie_keys, minimum_value_length
+    )
     index_key = Nibbles(index_nibbles)
 
-    # delete all nodes
-    dropped_nodes = dict(node_db)
-    node_db.clear()
-
     # Core of the test: use the fog to convince yourself that you've
     # traversed the entire trie
-    fog = HexaryTrieFog()
+    fog = HexaryTrieFog.EMPTY
+    found_keys = set()
     for _ in range(100000):
         # Look up the next prefix to explore
         try:
@@ -80,6 +118,8 @@ def test_trie_walk_backfilling(trie_keys, minimum_value_length, index_nibbles):
             # Node was found, use the found node to "lift the fog" down
             # to its longer prefixes
             fog = fog.explore(nearest_key, node.sub_segments)
+            if node.value:
+                found_keys.add(nibbles_to_bytes(nearest_key + node.suffix))
     else:
         raise AssertionError("Must finish iterating the trie within ~100k runs")
 
@@ -87,10 +127,7 @@ def test_trie_walk_backfilling(trie_keys, minimum_value_length, index_nibbles):
     assert len(dropped_nodes) == 0
     # Make sure the fog agrees that it's completed
     assert fog.is_complete
-    # Make sure we can walk the whole trie without any missing nodes
-    iterator = NodeIterator(trie)
-    found_keys = set(iterator.keys())
-    # Make sure we found all the keys
+    # Make sure the walk found all the keys
     assert found_keys == set(trie_keys)
 
 
@@ -109,15 +146,15 @@ def test_trie_walk_backfilling_with_traverse_from(
     trie_keys, minimum_value_length, index_nibbles
 ):
     """
-    Like test_trie_walk_backfilling but using the HexaryTrie.traverse_from API
+    Like test_trie_walk_backfilling but using the HexaryTrie.traverse_from API,
+    starting each traversal from the closest parent node in a TrieFrontierCache
     """
-    node_db, trie = trie_from_keys(trie_keys, minimum_value_length, prune=True)
+    # start with all nodes deleted
+    node_db, trie, dropped_nodes = pruning_trie_without_nodes(
+        trie_keys, minimum_value_length
+    )
     index_key = Nibbles(index_nibbles)
 
-    # delete all nodes
-    dropped_nodes = dict(node_db)
-    node_db.clear()
-
     # traverse_from() cannot traverse to the root node, so resolve that manually
     try:
         root = trie.root_node
@@ -127,7 +164,9 @@ def test_trie_walk_backfilling_with_traverse_from(
 
     # Core of the test: use the fog to convince yourself that you've
     # traversed the entire trie
-    fog = HexaryTrieFog()
+    fog = HexaryTrieFog.EMPTY
+    cache = TrieFrontierCache()
+    found_keys = set()
     for _ in range(100000):
         # Look up the next prefix to explore
         try:
@@ -136,10 +175,18 @@ def test_trie_walk_backfilling_with_traverse_from(
             # Test Complete!
             break
 
+        # Navigate from the closest cached parent node, or from the root if the
+        # prefix has none. Only the root prefix should not be cached.
+        try:
+            parent_node, uncached_key = cache.get(nearest_key)
+        except KeyError:
+            assert nearest_key == ()
+            parent_node, uncached_key = root, nearest_key
+
         # Try to navigate to the prefix, catching any errors about nodes
         # missing from the DB
         try:
-            node = trie.traverse_from(root, nearest_key)
+            node = trie.traverse_from(parent_node, uncached_key)
         except MissingTraversalNode as exc:
             # Node was missing, so fill in the node and try again
             node_db[exc.missing_node_hash] = dropped_nodes.pop(exc.missing_node_hash)
@@ -148,6 +195,13 @@ def test_trie_walk_backfilling_with_traverse_from(
             # Node was found, use the found node to "lift the fog" down
             # to its longer prefixes
             fog = fog.explore(nearest_key, node.sub_segments)
+            if node.value:
+                found_keys.add(nibbles_to_bytes(nearest_key + node.suffix))
+
+            if node.sub_segments:
+                cache.add(nearest_key, node, node.sub_segments)
+            else:
+                cache.delete(nearest_key)
     else:
         raise AssertionError("Must finish iterating the trie within ~100k runs")
 
@@ -155,13 +209,30 @@ def test_trie_walk_backfilling_with_traverse_from(
     assert len(dropped_nodes) == 0
     # Make sure the fog agrees that it's completed
     assert fog.is_complete
-    # Make sure we can walk the whole trie without any missing nodes
-    iterator = NodeIterator(trie)
-    found_keys = set(iterator.keys())
-    # Make sure we found all the keys
+    # Make sure the walk found all the keys
     assert found_keys == set(trie_keys)
 
 
+# One trie change, tagged with its kind, so that tests can dispatch on the tag
+TRIE_CHANGE_STRATEGY = st.one_of(
+    # insert a new key
+    st.tuples(st.just("insert"), st.binary(min_size=3, max_size=3)),
+    # update
+    st.tuples(
+        st.just("update"),
+        # index into existing key
+        st.integers(min_value=1, max_value=1024),
+        st.binary(min_size=1, max_size=128),
+    ),
+    # delete
+    st.tuples(
+        st.just("delete"),
+        # index into existing key
+        st.integers(min_value=1, max_value=1024),
+    ),
+)
+
+
 @given(
     # starting trie keys
     trie_keys_with_extensions(allow_empty_trie=False),
@@ -170,25 +241,7 @@ def test_trie_walk_backfilling_with_traverse_from(
     # how many fog expansions to try before modifying the trie
     st.integers(min_value=0, max_value=10000),
     # all trie changes to make before the second trie walk
-    st.lists(
-        # one change, might be a...
-        st.one_of(
-            # insert
-            st.binary(min_size=3, max_size=3),
-            # update
-            st.tuples(
-                # index into existing key
-                st.integers(min_value=1, max_value=1024),
-                st.binary(min_size=1, max_size=128),
-            ),
-            # delete
-            st.tuples(
-                # index into existing key
-                st.integers(min_value=1, max_value=1024),
-                st.none(),
-            ),
-        ),
-    ),
+    st.lists(TRIE_CHANGE_STRATEGY),
     # where to look for missing nodes in the first trie walk
     st.lists(
         st.integers(min_value=0, max_value=0xF),
@@ -206,7 +259,7 @@ def test_trie_walk_backfilling_with_traverse_from(
     trie_keys=[b"\x00\x00\x00", b"\x10\x00\x00"],
     minimum_value_length=26,
     number_explorations=86,
-    trie_changes=[(1, None)],
+    trie_changes=[("delete", 1)],
     index_nibbles=[],
     index_nibbles2=[],
 )
@@ -217,7 +270,7 @@ def test_trie_walk_backfilling_with_traverse_from(
     trie_keys=[b"\x00\x00\x01"],
     minimum_value_length=0,
     number_explorations=0,
-    trie_changes=[b"\x00\x00\x01"],
+    trie_changes=[("insert", b"\x00\x00\x01")],
     index_nibbles=[],
     index_nibbles2=[],
 )
@@ -230,7 +283,7 @@ def test_trie_walk_backfilling_with_traverse_from(
     trie_keys=[b"\x00\x01\x00", b"\x00\x01\x01", b"\x00\x00\x00"],
     minimum_value_length=27,
     number_explorations=0,
-    trie_changes=[(1, None), (3, None)],
+    trie_changes=[("delete", 1), ("delete", 3)],
     index_nibbles=[],
     index_nibbles2=[],
 )
@@ -240,7 +293,7 @@ def test_trie_walk_backfilling_with_traverse_from(
     trie_keys=[b"\x00\x00\x00", b"\x10\x00\x00"],
     minimum_value_length=26,
     number_explorations=86,
-    trie_changes=[(1, None)],
+    trie_changes=[("delete", 1)],
     index_nibbles=[],
     index_nibbles2=[],
 )
@@ -250,11 +303,11 @@ def test_trie_walk_backfilling_with_traverse_from(
     trie_keys=[b"\x01\x00\x00", b"\x01\x01\x00", b"\x00\x00"],
     minimum_value_length=3,
     number_explorations=2,
-    trie_changes=[(2, None)],
+    trie_changes=[("delete", 2)],
     index_nibbles=[],
     index_nibbles2=[],
 )
-@settings(max_examples=500)
+@settings(max_examples=200)
 def test_trie_walk_root_change_with_traverse(
     trie_keys,
     minimum_value_length,
@@ -272,17 +325,16 @@ def test_trie_walk_root_change_with_traverse(
         the NEW trie root are required)
     """
     # Turn on pruning to simulate having peers lose access to old trie nodes over time
-    node_db, trie = trie_from_keys(trie_keys, minimum_value_length, prune=True)
-
-    number_explorations %= len(node_db)
+    # Start with all nodes deleted
+    node_db, trie, missing_nodes = pruning_trie_without_nodes(
+        trie_keys, minimum_value_length
+    )
 
-    # delete all nodes
-    missing_nodes = dict(node_db)
-    node_db.clear()
+    number_explorations %= len(missing_nodes)
 
     # First walk
     index_key = tuple(index_nibbles)
-    fog = HexaryTrieFog()
+    fog = HexaryTrieFog.EMPTY
     for _ in range(number_explorations):
         # Look up the next prefix to explore
         try:
@@ -317,21 +369,25 @@ def test_trie_walk_root_change_with_traverse(
                 # Catch any missing nodes during trie change, and fix them up.
                 # This is equivalent to Trinity's "Beam Sync".
                 try:
-                    if isinstance(change, bytes):
-                        # insert!
-                        trie_batch[change] = change
-                        expected_final_keys.add(change)
-                    else:
-                        key_index, new_value = change
+                    change_kind = change[0]
+                    if change_kind == "insert":
+                        _, key = change
+                        trie_batch[key] = key
+                        expected_final_keys.add(key)
+                    elif change_kind == "update":
+                        # update (though may be an insert,
+                        # if there was a previous delete)
+                        _, key_index, new_value = change
+                        key = trie_keys[key_index % len(trie_keys)]
+                        trie_batch[key] = new_value
+                        expected_final_keys.add(key)
+                    elif change_kind == "delete":
+                        _, key_index = change
                         key = trie_keys[key_index % len(trie_keys)]
-                        if new_value is None:
-                            del trie_batch[key]
-                            expected_final_keys.discard(key)
-                        else:
-                            # update (though may be an insert,
-                            # if there was a previous delete)
-                            trie_batch[key] = new_value
-                            expected_final_keys.add(key)
+                        del trie_batch[key]
+                        expected_final_keys.discard(key)
+                    else:
+                        raise Exception(f"Invariant: unknown change {change!r}")
                 except MissingTrieNode as exc:
                     node_db[exc.missing_node_hash] = missing_nodes.pop(
                         exc.missing_node_hash
@@ -342,7 +398,10 @@ def test_trie_walk_root_change_with_traverse(
     # Second walk
     index_key2 = tuple(index_nibbles2)
 
-    for _ in range(100000):
+    # Every step either restores a missing node or explores a trie node, so the
+    # walk must finish well within this many steps
+    max_steps = 32 * (len(trie_keys) + len(trie_changes) + len(missing_nodes) + 1)
+    for _ in range(max_steps):
         try:
             nearest_key = fog.nearest_unknown(index_key2)
         except PerfectVisibility:
@@ -365,7 +424,7 @@ def test_trie_walk_root_change_with_traverse(
         # or if you traversed a partial path
         fog = fog.explore(nearest_key, sub_segments)
     else:
-        raise AssertionError("Must finish iterating the trie within ~100k runs")
+        raise AssertionError(f"Must finish iterating the trie within {max_steps} runs")
 
     # Final assertions
     assert fog.is_complete
@@ -386,25 +445,7 @@ def test_trie_walk_root_change_with_traverse(
     # how many fog expansions to try before modifying the trie
     st.integers(min_value=0, max_value=10000),
     # all trie changes to make before the second trie walk
-    st.lists(
-        # one change, might be a...
-        st.one_of(
-            # insert
-            st.binary(min_size=3, max_size=3),
-            # update
-            st.tuples(
-                # index into existing key
-                st.integers(min_value=1, max_value=1024),
-                st.binary(min_size=1, max_size=128),
-            ),
-            # delete
-            st.tuples(
-                # index into existing key
-                st.integers(min_value=1, max_value=1024),
-                st.none(),
-            ),
-        ),
-    ),
+    st.lists(TRIE_CHANGE_STRATEGY),
     # where to look for missing nodes in the first trie walk
     st.lists(
         st.integers(min_value=0, max_value=0xF),
@@ -422,11 +463,11 @@ def test_trie_walk_root_change_with_traverse(
     trie_keys=[b"\x01\x00\x00", b"\x01\x01\x00", b"\x00\x00"],
     minimum_value_length=3,
     number_explorations=2,
-    trie_changes=[(2, None)],
+    trie_changes=[("delete", 2)],
     index_nibbles=[],
     index_nibbles2=[],
 )
-@settings(max_examples=500)
+@settings(max_examples=200)
 @pytest.mark.parametrize("do_cache_reset", (True, False))
 def test_trie_walk_root_change_with_cached_traverse_from(
     do_cache_reset,
@@ -442,18 +483,17 @@ def test_trie_walk_root_change_with_cached_traverse_from(
     when possible.
     """
     # Turn on pruning to simulate having peers lose access to old trie nodes over time
-    node_db, trie = trie_from_keys(trie_keys, minimum_value_length, prune=True)
+    # Start with all nodes deleted
+    node_db, trie, missing_nodes = pruning_trie_without_nodes(
+        trie_keys, minimum_value_length
+    )
 
-    number_explorations %= len(node_db)
+    number_explorations %= len(missing_nodes)
     cache = TrieFrontierCache()
 
-    # delete all nodes
-    missing_nodes = dict(node_db)
-    node_db.clear()
-
     # First walk
     index_key = tuple(index_nibbles)
-    fog = HexaryTrieFog()
+    fog = HexaryTrieFog.EMPTY
     for _ in range(number_explorations):
         try:
             nearest_prefix = fog.nearest_unknown(index_key)
@@ -499,21 +539,25 @@ def test_trie_walk_root_change_with_cached_traverse_from(
                 # Catch any missing nodes during trie change, and fix them up.
                 # This is equivalent to Trinity's "Beam Sync".
                 try:
-                    if isinstance(change, bytes):
-                        # insert!
-                        trie_batch[change] = change.rjust(minimum_value_length, b"3")
-                        expected_final_keys.add(change)
-                    else:
-                        key_index, new_value = change
+                    change_kind = change[0]
+                    if change_kind == "insert":
+                        _, key = change
+                        trie_batch[key] = key.rjust(minimum_value_length, b"3")
+                        expected_final_keys.add(key)
+                    elif change_kind == "update":
+                        # update (though may be an insert,
+                        # if there was a previous delete)
+                        _, key_index, new_value = change
+                        key = trie_keys[key_index % len(trie_keys)]
+                        trie_batch[key] = new_value
+                        expected_final_keys.add(key)
+                    elif change_kind == "delete":
+                        _, key_index = change
                         key = trie_keys[key_index % len(trie_keys)]
-                        if new_value is None:
-                            del trie_batch[key]
-                            expected_final_keys.discard(key)
-                        else:
-                            # update (though may be an insert,
-                            # if there was a previous delete)
-                            trie_batch[key] = new_value
-                            expected_final_keys.add(key)
+                        del trie_batch[key]
+                        expected_final_keys.discard(key)
+                    else:
+                        raise Exception(f"Invariant: unknown change {change!r}")
                 except MissingTrieNode as exc:
                     node_db[exc.missing_node_hash] = missing_nodes.pop(
                         exc.missing_node_hash
@@ -526,7 +570,10 @@ def test_trie_walk_root_change_with_cached_traverse_from(
     if do_cache_reset:
         cache = TrieFrontierCache()
 
-    for _ in range(100000):
+    # Every step either restores a missing node, drops a stale cached node, or
+    # explores a trie node, so the walk must finish well within this many steps
+    max_steps = 32 * (len(trie_keys) + len(trie_changes) + len(missing_nodes) + 1)
+    for _ in range(max_steps):
         try:
             nearest_prefix = fog.nearest_unknown(index_key2)
         except PerfectVisibility:
@@ -564,7 +611,7 @@ def test_trie_walk_root_change_with_cached_traverse_from(
         else:
             cache.delete(nearest_prefix)
     else:
-        raise AssertionError("Must finish iterating the trie within ~100k runs")
+        raise AssertionError(f"Must finish iterating the trie within {max_steps} runs")
 
     # Final assertions
     assert fog.is_complete
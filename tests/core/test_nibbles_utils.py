@@ -1,10 +1,18 @@
+import pytest
+
 from hypothesis import (
     given,
     strategies as st,
 )
 
+from trie.exceptions import (
+    InvalidNibbles,
+)
 from trie.utils.nibbles import (
     bytes_to_nibbles,
+    decode_nibbles,
+    encode_hex_prefix,
+    encode_nibbles,
     nibbles_to_bytes,
 )
 
@@ -14,3 +22,53 @@ def test_round_trip_nibbling(value):
     value_as_nibbles = bytes_to_nibbles(value)
     result = nibbles_to_bytes(value_as_nibbles)
     assert result == value
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    (
+        (b"", ()),
+        (b"\x00", (0, 0)),
+        (b"\x01\xab\xff", (0, 1, 0xA, 0xB, 0xF, 0xF)),
+        (bytearray(b"ab"), (6, 1, 6, 2)),
+        (memoryview(b"ab"), (6, 1, 6, 2)),
+    ),
+)
+def test_bytes_to_nibbles(value, expected):
+    assert bytes_to_nibbles(value) == expected
+
+
+def test_bytes_to_nibbles_of_bytes_subclass_with_prefixed_hex():
+    class PrefixedHexBytes(bytes):
+        # like HexBytes before v1.0
+        def hex(self):
+            return "0x" + super().hex()
+
+    assert bytes_to_nibbles(PrefixedHexBytes(b"\x01\xab")) == (0, 1, 0xA, 0xB)
+
+
+@pytest.mark.parametrize(
+    "nibbles,is_leaf,expected",
+    (
+        ((), False, b"\x00"),
+        ((), True, b"\x20"),
+        ((1, 2, 3, 4, 5), False, b"\x11\x23\x45"),
+        ((0, 1, 2, 3, 4, 5), False, b"\x00\x01\x23\x45"),
+        ((0, 0xF, 1, 0xC, 0xB, 8), True, b"\x20\x0f\x1c\xb8"),
+        ((0xF, 1, 0xC, 0xB, 8), True, b"\x3f\x1c\xb8"),
+    ),
+)
+def test_encode_hex_prefix(nibbles, is_leaf, expected):
+    assert encode_hex_prefix(nibbles, is_leaf) == expected
+    if is_leaf:
+        assert encode_nibbles(nibbles + (16,)) == expected
+        assert decode_nibbles(expected) == nibbles + (16,)
+    else:
+        assert encode_nibbles(nibbles) == expected
+        assert decode_nibbles(expected) == nibbles
+
+
+@pytest.mark.parametrize("nibbles", ((16,), (1, 2, 16), (-1,), (0, 0x10)))
+def test_encode_hex_prefix_rejects_invalid_nibbles(nibbles):
+    with pytest.raises(InvalidNibbles):
+        encode_hex_prefix(nibbles, is_leaf=True)
@@ -19,10 +19,20 @@ from trie.utils.nodes import (
     (
         ([], [], 0),
         ([], [1], 0),
+        ([2], [1], 0),
         ([1], [1], 1),
         ([1], [1, 1], 1),
         ([1, 2], [1, 1], 1),
+        ([1, 2], [1, 2], 2),
+        ([1, 2, 3], [1, 2, 4], 2),
         ([1, 2, 3, 4, 5, 6], [1, 2, 3, 5, 6], 3),
+        (b"", b"", 0),
+        (b"", b"\x01", 0),
+        (b"\x01", b"\x01", 1),
+        (b"\x01", b"\x01\x01", 1),
+        (b"\x01\x00", b"\x01\x01", 1),
+        (b"\x00\x01\x00\x01\x01\x00", b"\x00\x01\x00\x00\x01", 3),
+        (b"\xff" * 40 + b"\x01", b"\xff" * 40 + b"\x01\x00", 41),
     ),
 )
 def test_get_common_prefix_length(left, right, expected):
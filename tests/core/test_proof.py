@@ -3,6 +3,7 @@ import pytest
 from eth_hash.auto import (
     keccak,
 )
+import rlp
 
 from trie.exceptions import (
     BadTrieProof,
@@ -42,6 +43,53 @@ def test_get_proof_key_does_not_exist():
     assert HexaryTrie.get_from_proof(trie.root_hash, b"hey", proof) == b""
 
 
+def test_get_from_proof_short_root_node():
+    trie = HexaryTrie({})
+    trie[b"a"] = b"b"
+    proof = trie.get_proof(b"a")
+
+    # a node this short would be embedded in a parent, but the root is looked up by hash
+    assert len(rlp.encode(proof[0])) < 32
+    assert HexaryTrie.get_from_proof(trie.root_hash, b"a", proof) == b"b"
+    assert HexaryTrie.get_from_proof(trie.root_hash, b"c", proof) == b""
+
+
+def test_get_proofs_match_get_proof():
+    trie = HexaryTrie({})
+    for index in range(100):
+        trie[keccak(bytes([index]))] = b"value" * index
+
+    keys = [keccak(bytes([index])) for index in range(0, 120, 3)] + [b"", b"hey"]
+    proofs = trie.get_proofs(keys)
+
+    assert proofs == tuple(trie.get_proof(key) for key in keys)
+    for key, proof in zip(keys, proofs):
+        assert HexaryTrie.get_from_proof(trie.root_hash, key, proof) == trie.get(key)
+
+
+def test_get_proofs_can_be_modified_independently():
+    trie = HexaryTrie({})
+    for index in range(100):
+        trie[keccak(bytes([index]))] = b"value" * index
+
+    first_key, second_key = keccak(b"\x00"), keccak(b"\x01")
+    first_proof, second_proof = trie.get_proofs([first_key, second_key])
+
+    # both proofs start at the root branch node, so tampering with one must not
+    #   change the other
+    first_proof[0][first_key[0] >> 4] = b""
+    assert second_proof == trie.get_proof(second_key)
+    with pytest.raises(BadTrieProof):
+        HexaryTrie.get_from_proof(trie.root_hash, first_key, first_proof)
+    second_value = HexaryTrie.get_from_proof(trie.root_hash, second_key, second_proof)
+    assert second_value == trie.get(second_key)
+
+
+def test_get_proofs_empty_trie():
+    trie = HexaryTrie({})
+    assert trie.get_proofs([b"hello", b"hey"]) == ((), ())
+
+
 def test_get_from_proof_invalid():
     from .sample_proof_key_exists import (
         key,
@@ -7,6 +7,7 @@ from hypothesis import (
 )
 
 from trie.typing import (
+    Nibble,
     Nibbles,
 )
 
@@ -25,6 +26,7 @@ from trie.typing import (
 def test_valid_nibbles(valid_nibbles):
     typed_nibbles = Nibbles(valid_nibbles)
     assert typed_nibbles == tuple(valid_nibbles)
+    assert all(type(nibble) is Nibble for nibble in typed_nibbles)
 
 
 @pytest.mark.parametrize(
@@ -40,6 +42,7 @@ def test_valid_nibbles(valid_nibbles):
         (0xF, TypeError),
         ((0, 0x10), ValueError),
         ((0, -1), ValueError),
+        (([0],), ValueError),  # unhashable nibble
     ),
 )
 def test_invalid_nibbles(invalid_nibbles, exception):
@@ -68,6 +71,20 @@ def test_nibbles_repr(nibbles_input, as_ipython):
 
     evaluated_repr = eval(repr_string)
     assert evaluated_repr == tuple(nibbles_input)
+    assert str(nibbles) == repr(nibbles)
 
     re_cast = Nibbles(evaluated_repr)
     assert re_cast == nibbles
+
+
+@pytest.mark.parametrize("right", ((3, 4), Nibbles((3, 4))))
+def test_nibbles_add(right):
+    added = Nibbles((1, 2)) + right
+    assert type(added) is Nibbles
+    assert added == (1, 2, 3, 4)
+    assert all(type(nibble) is Nibble for nibble in added)
+
+
+def test_nibbles_add_invalid():
+    with pytest.raises(ValueError):
+        Nibbles((1, 2)) + (3, 0x10)
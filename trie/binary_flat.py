@@ -0,0 +1,241 @@
+from eth_hash.auto import (
+    keccak,
+)
+from sortedcontainers import (
+    SortedDict,
+)
+
+from trie.constants import (
+    BLANK_HASH,
+)
+from trie.exceptions import (
+    NodeOverrideError,
+    ValidationError,
+)
+from trie.utils.binaries import (
+    encode_to_bin,
+)
+from trie.utils.nodes import (
+    encode_branch_node,
+    encode_kv_node,
+    encode_leaf_node,
+    get_common_prefix_length,
+)
+from trie.validation import (
+    validate_is_bytes,
+)
+
+
+class FlatBinaryTrie:
+    """
+    A binary trie that only stores its (key, value) pairs, using the flat storage
+    model described in EIP-3102. Setting or deleting a key is a single write, and
+    the intermediate nodes are only recalculated when the root hash is requested.
+
+    The root hash is always identical to the one a :class:`trie.binary.BinaryTrie`
+    would have with the same contents. Because no nodes are stored, the trie cannot
+    be loaded from an existing root hash.
+    """
+
+    def __init__(self, leaves=None):
+        self._leaves = SortedDict()
+        self._root_hash = BLANK_HASH
+        self._is_root_dirty = False
+
+        if leaves is not None:
+            for key, value in leaves.items():
+                self.set(key, value)
+
+    def get(self, key):
+        validate_is_bytes(key)
+
+        return self._leaves.get(key)
+
+    def set(self, key, value):
+        """
+        Sets the value at the given key. An empty value deletes the key.
+
+        Like :meth:`trie.binary.BinaryTrie.set`, no key may be the prefix
+        of another key.
+        """
+        validate_is_bytes(key)
+        validate_is_bytes(value)
+
+        if not value:
+            self.delete(key)
+            return
+
+        self._validate_no_prefix_key(key)
+        if key not in self._leaves:
+            # Keys sort right after any of their prefixes, so only the
+            # following key can have the new key as a prefix
+            following_key_index = self._leaves.bisect_right(key)
+            if following_key_index < len(self._leaves):
+                following_key = self._leaves.keys()[following_key_index]
+                if following_key.startswith(key):
+                    raise NodeOverrideError(
+                        "Fail to set the value because it's key"
+                        " is the prefix of other existing key"
+                    )
+
+        # Like BinaryTrie, an empty key only fails validation once it's known not
+        #   to conflict with (i.e. be the prefix of) an existing key
+        if not key:
+            raise ValidationError("Key path can not be empty")
+
+        self._leaves[key] = value
+        self._is_root_dirty = True
+
+    def exists(self, key):
+        validate_is_bytes(key)
+
+        return key in self._leaves
+
+    def delete(self, key):
+        """
+        Equals to setting the value to None
+        """
+        validate_is_bytes(key)
+
+        self._validate_no_prefix_key(key)
+        if key in self._leaves:
+            del self._leaves[key]
+            self._is_root_dirty = True
+        else:
+            # BinaryTrie refuses to delete a key whose keypath ends exactly at a node
+            sub_keys = self._get_keys_with_prefix(key)
+            if sub_keys and self._is_at_node_boundary(key, sub_keys):
+                raise NodeOverrideError(
+                    "Fail to set the value because it's key"
+                    " is the prefix of other existing key"
+                )
+
+    def delete_subtrie(self, key):
+        """
+        Given a key prefix, delete the whole subtrie that starts with the key prefix.
+        """
+        validate_is_bytes(key)
+
+        self._validate_no_prefix_key(key)
+        for sub_key in self._get_keys_with_prefix(key):
+            del self._leaves[sub_key]
+            self._is_root_dirty = True
+
+    @property
+    def root_hash(self):
+        if self._is_root_dirty:
+            if self._leaves:
+                keypaths = [encode_to_bin(key) for key in self._leaves.keys()]
+                values = self._leaves.values()
+                root_node = self._build_node(keypaths, values, 0, len(keypaths), 0)
+                self._root_hash = keccak(root_node)
+            else:
+                self._root_hash = BLANK_HASH
+            self._is_root_dirty = False
+
+        return self._root_hash
+
+    #
+    # Utils
+    #
+    def _validate_no_prefix_key(self, key):
+        # Any existing key which is a prefix of key must be the key right before it
+        preceding_key_index = self._leaves.bisect_left(key)
+        if preceding_key_index > 0:
+            preceding_key = self._leaves.keys()[preceding_key_index - 1]
+            if key.startswith(preceding_key):
+                raise NodeOverrideError(
+                    "Fail to set the value because the prefix of it's key"
+                    " is the same as existing key"
+                )
+
+    def _get_keys_with_prefix(self, prefix):
+        sub_keys = []
+        for key in self._leaves.irange(minimum=prefix):
+            if not key.startswith(prefix):
+                break
+            sub_keys.append(key)
+        return sub_keys
+
+    def _is_at_node_boundary(self, key, sub_keys):
+        """
+        Whether the keypath of key ends exactly where one of the nodes above the
+        sorted sub_keys (all the keys that have key as a prefix) starts.
+        """
+        keypath_length = 8 * len(key)
+
+        # The node above all of sub_keys starts right below the deepest branch they
+        # share with any other key, or at the root. Only the keys just before and
+        # just after sub_keys can share that branch.
+        first_index = self._leaves.bisect_left(key)
+        top_node_depth = 0
+        for neighbor_index in (first_index - 1, first_index + len(sub_keys)):
+            if 0 <= neighbor_index < len(self._leaves):
+                neighbor_key = self._leaves.keys()[neighbor_index]
+                branch_depth = _get_common_keypath_length(neighbor_key, sub_keys[0])
+                top_node_depth = max(top_node_depth, branch_depth + 1)
+
+        if keypath_length == top_node_depth:
+            return True
+        elif len(sub_keys) > 1:
+            # If the top node is a kv node, the branch node splitting sub_keys is next
+            return keypath_length == _get_common_keypath_length(
+                sub_keys[0], sub_keys[-1]
+            )
+        else:
+            return False
+
+    def _build_node(self, keypaths, values, start, end, depth):
+        """
+        Build the encoded node for the sorted keypaths[start:end], all of which
+        share the first `depth` bits of their keypath.
+        """
+        first_keypath = keypaths[start]
+
+        if end - start == 1:
+            leaf_node = encode_leaf_node(values[start])
+            if len(first_keypath) == depth:
+                return leaf_node
+            else:
+                return encode_kv_node(first_keypath[depth:], keccak(leaf_node))
+
+        # Keypaths are sorted, so the prefix shared by the first and last
+        # keypath is shared by all of them
+        branch_depth = depth + get_common_prefix_length(
+            first_keypath[depth:], keypaths[end - 1][depth:]
+        )
+
+        # Every keypath with a 1 at the branch depth sorts after all those with a 0
+        split = start + 1
+        while keypaths[split][branch_depth] == 0:
+            split += 1
+
+        branch_node = encode_branch_node(
+            keccak(self._build_node(keypaths, values, start, split, branch_depth + 1)),
+            keccak(self._build_node(keypaths, values, split, end, branch_depth + 1)),
+        )
+        if branch_depth > depth:
+            return encode_kv_node(
+                first_keypath[depth:branch_depth], keccak(branch_node)
+            )
+        else:
+            return branch_node
+
+    #
+    # Dictionary API
+    #
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        return self.set(key, value)
+
+    def __delitem__(self, key):
+        return self.delete(key)
+
+    def __contains__(self, key):
+        return self.exists(key)
+
+
+def _get_common_keypath_length(left_key, right_key):
+    return get_common_prefix_length(encode_to_bin(left_key), encode_to_bin(right_key))
@@ -1,3 +1,6 @@
+from functools import (
+    cached_property,
+)
 from typing import (
     Optional,
 )
@@ -188,7 +191,9 @@ class TraversedPartialPath(Exception):
             Nibbles(untraversed_tail),
             *args,
         )
-        self._simulated_node = self._make_simulated_node()
+        # Validate the partial path eagerly, but only build the simulated node
+        #   (which must hex-prefix encode a new key) if it is requested
+        self._simulated_key_tail = self._trim_node_key()
 
     def __repr__(self) -> str:
         return (
@@ -224,7 +229,7 @@ class TraversedPartialPath(Exception):
         """
         return self.args[2]
 
-    @property
+    @cached_property
     def simulated_node(self) -> HexaryTrieNode:
         """
         For the purposes of walking a trie, we might only be interested in the
@@ -234,12 +239,38 @@ class TraversedPartialPath(Exception):
 
         See the trie walk tests for an example of how this is used.
         """
-        return self._simulated_node
-
-    def _make_simulated_node(self) -> HexaryTrieNode:
         from trie.utils.nodes import (
             compute_extension_key,
             compute_leaf_key,
+        )
+
+        actual_node = self.node
+        trimmed_key = self._simulated_key_tail
+
+        if len(actual_node.sub_segments) == 0:
+            return HexaryTrieNode(
+                (),
+                actual_node.value,
+                trimmed_key,
+                [compute_leaf_key(trimmed_key), actual_node.raw[1]],
+                NodeType(NODE_TYPE_LEAF),
+            )
+        else:
+            return HexaryTrieNode(
+                (trimmed_key,),
+                actual_node.value,
+                actual_node.suffix,
+                [compute_extension_key(trimmed_key), actual_node.raw[1]],
+                NodeType(NODE_TYPE_EXTENSION),
+            )
+
+    def _trim_node_key(self) -> Nibbles:
+        """
+        Validate that the untraversed tail reaches part-way into the node's key, and
+        return the remainder of the key: the leaf suffix or extension sub-segment that
+        the simulated node will have.
+        """
+        from trie.utils.nodes import (
             key_starts_with,
         )
 
@@ -260,15 +291,7 @@ class TraversedPartialPath(Exception):
                     f"does not start with {key_tail}"
                 )
             else:
-                trimmed_suffix = Nibbles(actual_node.suffix[len(key_tail) :])
-
-            return HexaryTrieNode(
-                (),
-                actual_node.value,
-                trimmed_suffix,
-                [compute_leaf_key(trimmed_suffix), actual_node.raw[1]],
-                NodeType(NODE_TYPE_LEAF),
-            )
+                return Nibbles(actual_node.suffix[len(key_tail) :])
         elif len(actual_sub_segments) == 1:
             extension = actual_sub_segments[0]
             if not key_starts_with(extension, key_tail):
@@ -281,15 +304,7 @@ class TraversedPartialPath(Exception):
                     f"Internal traverse bug: {key_tail} should not equal {extension}"
                 )
             else:
-                trimmed_extension = Nibbles(extension[len(key_tail) :])
-
-            return HexaryTrieNode(
-                (trimmed_extension,),
-                actual_node.value,
-                actual_node.suffix,
-                [compute_extension_key(trimmed_extension), actual_node.raw[1]],
-                NodeType(NODE_TYPE_EXTENSION),
-            )
+                return Nibbles(extension[len(key_tail) :])
         else:
             raise ValidationError(
                 f"Can only partially traverse into leaf or extension, got {actual_node}"
@@ -1,11 +1,18 @@
 import ast
+from bisect import (
+    bisect_left,
+    bisect_right,
+)
 from itertools import (
+    chain,
     zip_longest,
 )
 from typing import (
     Any,
+    ClassVar,
     Dict,
     Iterable,
+    Optional,
     Sequence,
     Tuple,
 )
@@ -14,16 +21,12 @@ from eth_utils import (
     ValidationError,
     to_tuple,
 )
-from sortedcontainers import (
-    SortedSet,
-)
 
 from trie.exceptions import (
     FullDirectionalVisibility,
     PerfectVisibility,
 )
 from trie.typing import (
-    GenericSortedSet,
     HexaryTrieNode,
     Nibbles,
     NibblesInput,
@@ -36,6 +39,12 @@ from trie.utils.nodes import (
     key_starts_with,
 )
 
+# Every new fog starts with the whole trie unexplored, so they can all share one tuple
+_FULLY_UNEXPLORED_PREFIXES = (Nibbles(()),)
+
+# How many nearest_unknown() and nearest_right() answers to remember, per fog
+_MAX_NEAREST_CACHE_SIZE = 256
+
 
 class HexaryTrieFog:
     """
@@ -47,15 +56,38 @@ class HexaryTrieFog:
     return a new HexaryTrieFog object.
     """
 
-    _unexplored_prefixes: GenericSortedSet[Nibbles]
+    __slots__ = (
+        "_unexplored_prefixes",
+        "_hash",
+        "_nearest_unknown_cache",
+        "_nearest_right_cache",
+    )
+
+    _unexplored_prefixes: Tuple[Nibbles, ...]
+    _hash: Optional[int]
+    _nearest_unknown_cache: Dict[Nibbles, Nibbles]
+    _nearest_right_cache: Dict[Nibbles, Nibbles]
+
+    # A fog that has explored nothing yet, set below the class. Fogs are immutable, so
+    #   every walk may start from this one instance instead of building a new one.
+    EMPTY: ClassVar["HexaryTrieFog"]
 
     # INVARIANT: No unexplored prefix may start with another unexplored prefix
     #   For example, _unexplored_prefixes may not be {(1, 2), (1, 2, 3)}.
 
+    # INVARIANT: _unexplored_prefixes is sorted and has no duplicates. Since the
+    #   object is immutable, every new fog can share the prefixes it doesn't change,
+    #   and a change only costs a bisect and a splice of the tuple.
+
     def __init__(self) -> None:
         # Always start without knowing anything about a trie. The only unexplored
         #   prefix is the root prefix: (), which means the whole trie is unexplored.
-        self._unexplored_prefixes = SortedSet({()})
+        self._unexplored_prefixes = _FULLY_UNEXPLORED_PREFIXES
+        # Hashing walks every prefix, so only do it when asked, and only once
+        self._hash = None
+        # The fog never changes, so the answer to a search never goes stale
+        self._nearest_unknown_cache = {}
+        self._nearest_right_cache = {}
 
     def __repr__(self) -> str:
         return f"HexaryTrieFog<{self._unexplored_prefixes!r}>"
@@ -82,13 +114,11 @@ class HexaryTrieFog:
         """
         old_prefix = Nibbles(old_prefix_input)
         sub_segments = [Nibbles(segment) for segment in foggy_sub_segments]
-        new_fog_prefixes = self._unexplored_prefixes.copy()
+        old_prefix_index = self._find_prefix_index(old_prefix)
 
-        try:
-            new_fog_prefixes.remove(old_prefix)
-        except KeyError:
+        if old_prefix_index is None:
             raise ValidationError(
-                f"Old parent {old_prefix} not found in {new_fog_prefixes!r}"
+                f"Old parent {old_prefix} not found in {self._unexplored_prefixes!r}"
             )
 
         if len(set(sub_segments)) != len(sub_segments):
@@ -118,8 +148,14 @@ class HexaryTrieFog:
                             f"of segment {trimmed_segment}"
                         )
 
-        new_fog_prefixes.update([old_prefix + segment for segment in sub_segments])
-        return self._new_trie_fog(new_fog_prefixes)
+        # No other unexplored prefix starts with old_prefix, so all the new prefixes
+        #   sort exactly where the old prefix was.
+        new_prefixes = sorted(old_prefix + segment for segment in sub_segments)
+        return self._new_trie_fog(
+            self._unexplored_prefixes[:old_prefix_index]
+            + tuple(new_prefixes)
+            + self._unexplored_prefixes[old_prefix_index + 1 :]
+        )
 
     def mark_all_complete(
         self, prefix_inputs: Sequence[NibblesInput]
@@ -133,16 +169,26 @@ class HexaryTrieFog:
             for complete_prefix in prefixes:
                 result_fog = result_fog.explore(complete_prefix, ())
         """
-        new_unexplored_prefixes = self._unexplored_prefixes.copy()
+        completed_indices = set()
         for prefix in map(Nibbles, prefix_inputs):
-            if prefix not in new_unexplored_prefixes:
+            index = self._find_prefix_index(prefix)
+            if index is None or index in completed_indices:
                 raise ValidationError(
                     f"When marking {prefix} complete, could not "
-                    f"find in {new_unexplored_prefixes!r}"
+                    f"find in {self._unexplored_prefixes!r}"
                 )
+            completed_indices.add(index)
+
+        # Build the remaining prefixes in one pass, from the runs between the
+        #   completed ones
+        remaining_runs = []
+        run_start = 0
+        for index in sorted(completed_indices):
+            remaining_runs.append(self._unexplored_prefixes[run_start:index])
+            run_start = index + 1
+        remaining_runs.append(self._unexplored_prefixes[run_start:])
 
-            new_unexplored_prefixes.remove(prefix)
-        return self._new_trie_fog(new_unexplored_prefixes)
+        return self._new_trie_fog(tuple(chain.from_iterable(remaining_runs)))
 
     def nearest_unknown(self, key_input: NibblesInput = ()) -> Nibbles:
         """
@@ -155,7 +201,16 @@ class HexaryTrieFog:
         """
         key = Nibbles(key_input)
 
-        index = self._unexplored_prefixes.bisect(key)
+        try:
+            return self._nearest_unknown_cache[key]
+        except KeyError:
+            nearest = self._find_nearest_unknown(key)
+            if len(self._nearest_unknown_cache) < _MAX_NEAREST_CACHE_SIZE:
+                self._nearest_unknown_cache[key] = nearest
+            return nearest
+
+    def _find_nearest_unknown(self, key: Nibbles) -> Nibbles:
+        index = bisect_right(self._unexplored_prefixes, key)
 
         if index == 0:
             # If sorted set is empty, bisect will return 0
@@ -189,7 +244,16 @@ class HexaryTrieFog:
         """
         key = Nibbles(key_input)
 
-        index = self._unexplored_prefixes.bisect(key)
+        try:
+            return self._nearest_right_cache[key]
+        except KeyError:
+            nearest = self._find_nearest_right(key)
+            if len(self._nearest_right_cache) < _MAX_NEAREST_CACHE_SIZE:
+                self._nearest_right_cache[key] = nearest
+            return nearest
+
+    def _find_nearest_right(self, key: Nibbles) -> Nibbles:
+        index = bisect_right(self._unexplored_prefixes, key)
 
         if index == 0:
             # If sorted set is empty, bisect will return 0
@@ -247,10 +311,24 @@ class HexaryTrieFog:
             #   comparison of the distance will show it as a smaller distance.
             yield final_high_nibble - final_low_nibble
 
+    def _find_prefix_index(self, prefix: Nibbles) -> Optional[int]:
+        """
+        Find the position of the prefix in the unexplored prefixes, or None if the
+        prefix is not unexplored.
+        """
+        index = bisect_left(self._unexplored_prefixes, prefix)
+        if (
+            index < len(self._unexplored_prefixes)
+            and self._unexplored_prefixes[index] == prefix
+        ):
+            return index
+        else:
+            return None
+
     @classmethod
-    def _new_trie_fog(cls, unexplored_prefixes: SortedSet) -> "HexaryTrieFog":
+    def _new_trie_fog(cls, unexplored_prefixes: Tuple[Nibbles, ...]) -> "HexaryTrieFog":
         """
-        Convert a set of unexplored prefixes to a proper HexaryTrieFog object.
+        Convert a sorted tuple of unexplored prefixes to a proper HexaryTrieFog object.
         """
         copy = cls()
         copy._unexplored_prefixes = unexplored_prefixes
@@ -271,20 +349,40 @@ class HexaryTrieFog:
         else:
             encoded_list = encoded[len(serial_prefix) :]
             prefix_list = ast.literal_eval(encoded_list.decode())
-            deserialized_prefixes = SortedSet(
-                # decode nibbles from compressed bytes value,
-                # and validate each value in range(16)
-                Nibbles(decode_nibbles(prefix))
-                for prefix in prefix_list
+            deserialized_prefixes = tuple(
+                sorted(
+                    {
+                        # decode nibbles from compressed bytes value,
+                        # and validate each value in range(16)
+                        Nibbles(decode_nibbles(prefix))
+                        for prefix in prefix_list
+                    }
+                )
             )
             return cls._new_trie_fog(deserialized_prefixes)
 
     def __eq__(self, other: Any) -> bool:
-        if not isinstance(other, HexaryTrieFog):
+        if self is other:
+            return True
+        elif not isinstance(other, HexaryTrieFog):
+            return False
+        elif (
+            self._hash is not None
+            and other._hash is not None
+            and self._hash != other._hash
+        ):
             return False
         else:
             return self._unexplored_prefixes == other._unexplored_prefixes
 
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self._unexplored_prefixes)
+        return self._hash
+
+
+HexaryTrieFog.EMPTY = HexaryTrieFog()
+
 
 class TrieFrontierCache:
     """
@@ -413,8 +413,20 @@ class HexaryTrie:
     def get_from_proof(cls, root_hash, key, proof):
         trie = cls({})
 
+        short_encoded_nodes = []
         for node in proof:
-            trie._set_raw_node(node)
+            validate_is_node(node)
+            encoded_node = encode_raw(node)
+            if len(encoded_node) < 32:
+                # A short node is embedded in its parent, so it is only ever looked up
+                #   by hash if it is the root. Don't hash it unless that's necessary.
+                short_encoded_nodes.append(encoded_node)
+            else:
+                trie.db[keccak(encoded_node)] = encoded_node
+
+        if root_hash not in trie.db:
+            for encoded_node in short_encoded_nodes:
+                trie.db[keccak(encoded_node)] = encoded_node
 
         with trie.at_root(root_hash) as proven_snapshot:
             try:
@@ -430,9 +442,42 @@ class HexaryTrie:
         node = self.get_node(self.root_hash)
         trie_key = bytes_to_nibbles(key)
 
-        return self._get_proof(node, trie_key)
+        return self._get_proof(self.get_node, node, trie_key)
+
+    def get_proofs(self, keys):
+        """
+        Get the proof of each key, in the same order as the keys.
+
+        Keys with a common prefix have the same nodes at the top of their proofs, so
+        each node is only read from the database and decoded once for the whole batch.
+        Each proof gets its own copy of its nodes, so modifying one proof leaves the
+        others intact.
+        """
+        for key in keys:
+            validate_is_bytes(key)
+
+        decoded_nodes = {}
+
+        def get_node_once(node_hash):
+            if isinstance(node_hash, list):
+                # embedded nodes are already decoded
+                return node_hash
+            elif node_hash not in decoded_nodes:
+                decoded_nodes[node_hash] = self.get_node(node_hash)
+            return decoded_nodes[node_hash]
+
+        root_node = get_node_once(self.root_hash)
+        return tuple(
+            tuple(
+                _copy_node(node)
+                for node in self._get_proof(
+                    get_node_once, root_node, bytes_to_nibbles(key)
+                )
+            )
+            for key in keys
+        )
 
-    def _get_proof(self, node, trie_key, proven_len=0, last_proof=tuple()):
+    def _get_proof(self, get_node, node, trie_key, proven_len=0, last_proof=tuple()):
         updated_proof = last_proof + (node,)
         unproven_key = trie_key[proven_len:]
 
@@ -444,19 +489,21 @@ class HexaryTrie:
         elif node_type == NODE_TYPE_EXTENSION:
             current_key = extract_key(node)
             if key_starts_with(unproven_key, current_key):
-                next_node = self.get_node(node[1])
+                next_node = get_node(node[1])
                 new_proven_len = proven_len + len(current_key)
                 return self._get_proof(
-                    next_node, trie_key, new_proven_len, updated_proof
+                    get_node, next_node, trie_key, new_proven_len, updated_proof
                 )
             else:
                 return updated_proof
         elif node_type == NODE_TYPE_BRANCH:
             if not unproven_key:
                 return updated_proof
-            next_node = self.get_node(node[unproven_key[0]])
+            next_node = get_node(node[unproven_key[0]])
             new_proven_len = proven_len + 1
-            return self._get_proof(next_node, trie_key, new_proven_len, updated_proof)
+            return self._get_proof(
+                get_node, next_node, trie_key, new_proven_len, updated_proof
+            )
         else:
             raise Exception("Invariant: This shouldn't ever happen")
 
@@ -886,3 +933,12 @@ def listify(node):
             yield listify(sub)
         else:
             yield sub
+
+
+@to_list
+def _copy_node(node):
+    for sub in node:
+        if isinstance(sub, list):
+            yield _copy_node(sub)
+        else:
+            yield sub
@@ -172,7 +172,7 @@ class NodeIterator:
         Iterate over all trie nodes, starting at the left-most available one (the root),
         then the left-most available one (its left-most child) and so on.
         """
-        next_fog = HexaryTrieFog()
+        next_fog = HexaryTrieFog.EMPTY
         cache = TrieFrontierCache()
 
         while True:
@@ -1,6 +1,34 @@
+import itertools
+
+from eth_hash.auto import (
+    keccak,
+)
+from rlp.codec import (
+    encode_raw,
+)
+
 from trie import (
     HexaryTrie,
 )
+from trie.constants import (
+    BLANK_NODE,
+    BLANK_NODE_HASH,
+)
+from trie.utils.nibbles import (
+    bytes_to_nibbles,
+)
+from trie.utils.nodes import (
+    compute_extension_key,
+    compute_leaf_key,
+    get_common_prefix_length,
+)
+
+
+def _key_to_value(key, minimum_value_length):
+    # Flood 3's at the end of the value to make it longer. b'3' is
+    # encoded to 0x33, so the bytes and HexBytes representation look
+    # the same. Just a convenience.
+    return key.ljust(minimum_value_length, b"3")
 
 
 def trie_from_keys(keys, minimum_value_length=0, prune=False):
@@ -13,9 +41,96 @@ def trie_from_keys(keys, minimum_value_length=0, prune=False):
     trie = HexaryTrie(node_db, prune=prune)
     with trie.squash_changes() as trie_batch:
         for k in keys:
-            # Flood 3's at the end of the value to make it longer. b'3' is
-            # encoded to 0x33, so the bytes and HexBytes representation look
-            # the same. Just a convenience.
-            trie_batch[k] = k.ljust(minimum_value_length, b"3")
+            trie_batch[k] = _key_to_value(k, minimum_value_length)
+
+    return node_db, trie
+
+
+def trie_from_keys_batch(keys, minimum_value_length=0, prune=False):
+    """
+    Make the same trie (and database) as :func:`trie_from_keys`, but build it
+    bottom-up from the sorted keys instead of inserting them one at a time. That way,
+    every node is encoded and hashed exactly once.
+    Return the raw database and the HexaryTrie.
+    """
+    items = {}
+    for key in keys:
+        value = _key_to_value(key, minimum_value_length)
+        if value:
+            items[bytes_to_nibbles(key)] = value
+        else:
+            # inserting a blank value is a delete
+            items.pop(bytes_to_nibbles(key), None)
+
+    node_db = {}
+    if items:
+        root_node = _build_node(node_db, sorted(items.items()), 0)
+        # The root node is always stored by hash, even if it is short
+        encoded_root = encode_raw(root_node)
+        root_hash = keccak(encoded_root)
+        node_db[root_hash] = encoded_root
+    else:
+        root_hash = BLANK_NODE_HASH
+
+    trie = HexaryTrie(node_db, root_hash, prune=prune)
+    if prune:
+        trie.ref_count.update(trie.regenerate_ref_count())
+        if root_hash != BLANK_NODE_HASH:
+            # trie_from_keys inserts with squash_changes(), which writes the root node
+            # once more when it exits, so match its reference count for the root
+            trie.ref_count[root_hash] += 1
 
     return node_db, trie
+
+
+def _build_node(node_db, items, depth):
+    """
+    Build the node at depth for the sorted (nibbles, value) items, which all share
+    the same first depth nibbles.
+    """
+    first_key, first_value = items[0]
+    if len(items) == 1:
+        return [compute_leaf_key(first_key[depth:]), first_value]
+
+    # the items are sorted, so the first and last keys have the shortest common prefix
+    last_key, _ = items[-1]
+    branch_depth = depth + get_common_prefix_length(
+        first_key[depth:], last_key[depth:]
+    )
+    branch_node = _build_branch_node(node_db, items, branch_depth)
+    if branch_depth == depth:
+        return branch_node
+    else:
+        return [
+            compute_extension_key(first_key[depth:branch_depth]),
+            _node_to_reference(node_db, branch_node),
+        ]
+
+
+def _build_branch_node(node_db, items, depth):
+    branch_node = [BLANK_NODE] * 17
+
+    first_key, first_value = items[0]
+    if len(first_key) == depth:
+        # A key that ends at the branch sorts first, and is stored in the branch itself
+        branch_node[16] = first_value
+        items = items[1:]
+
+    for nibble, child_items in itertools.groupby(
+        items, key=lambda item: item[0][depth]
+    ):
+        child_node = _build_node(node_db, tuple(child_items), depth + 1)
+        branch_node[nibble] = _node_to_reference(node_db, child_node)
+
+    return branch_node
+
+
+def _node_to_reference(node_db, node):
+    encoded_node = encode_raw(node)
+    if len(encoded_node) < 32:
+        # short nodes are embedded in their parent
+        return node
+
+    node_hash = keccak(encoded_node)
+    node_db[node_hash] = encoded_node
+    return node_hash
@@ -69,6 +69,9 @@ class Nibble(enum.IntEnum):
 # A user-input value, where each element will be validated as a Nibble instead of int
 NibblesInput = Sequence[int]
 
+# Looking up a nibble by value is much faster than calling Nibble(value)
+_NIBBLE_BY_VALUE = {nibble.value: nibble for nibble in Nibble}
+
 
 class Nibbles(Tuple[Nibble, ...]):
     def __new__(cls, nibbles: NibblesInput) -> "Nibbles":
@@ -76,15 +79,27 @@ class Nibbles(Tuple[Nibble, ...]):
             # instanceof thinks that a Tuple[Nibble, ...] *is* a Nibbles, so we use
             #   a stricter type check here
             return nibbles  # type: ignore  # mypy doesn't recognize that this is now a Nibbles # noqa: E501
-        elif not is_list_like(nibbles):
+        elif type(nibbles) not in (tuple, list) and not is_list_like(nibbles):
+            # Checking the exact common types first skips the slow abc check
             raise TypeError(f"Must pass in a tuple of nibbles, but got {nibbles!r}")
         else:
-            return tuple.__new__(
-                cls, (Nibble(maybe_nibble) for maybe_nibble in nibbles)
-            )
+            try:
+                return tuple.__new__(cls, map(_NIBBLE_BY_VALUE.__getitem__, nibbles))
+            except (KeyError, TypeError):
+                # Let Nibble raise the ValueError for whichever value is invalid
+                return tuple.__new__(
+                    cls, (Nibble(maybe_nibble) for maybe_nibble in nibbles)
+                )
 
     def __add__(self, other: Tuple[Nibble, ...]) -> "Nibbles":
-        return Nibbles(super().__add__(other))
+        if type(other) is Nibbles:
+            # Both sides were already validated, so skip validating the result
+            return tuple.__new__(Nibbles, super().__add__(other))
+        else:
+            return Nibbles(super().__add__(other))
+
+    def __str__(self) -> str:
+        return tuple.__repr__(self)
 
     def _repr_pretty_(self, p, cycle: bool) -> None:
         # Weird, ipython seems to drop the trailing comma in the pretty repr
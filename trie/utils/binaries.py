@@ -1,10 +1,3 @@
-from eth_utils import (
-    apply_to_return_value,
-)
-from eth_utils.toolz import (
-    partition_all,
-)
-
 from trie.constants import (
     EXP,
     PREFIX_00,
@@ -12,27 +5,38 @@ from trie.constants import (
     TWO_BITS,
 )
 
+# Each byte value mapped to its 8-byte, most-significant-bit-first expansion
+BYTE_TO_BIN_LOOKUP = tuple(
+    bytes(1 if byte & exp else 0 for exp in EXP) for byte in range(256)
+)
+BIN_TO_ASCII_TABLE = bytes.maketrans(b"\x00\x01", b"01")
+
 
-@apply_to_return_value(bytes)
 def decode_from_bin(input_bin):
     """
     0100000101010111010000110100100101001001 -> ASCII
     """
-    for chunk in partition_all(8, input_bin):
-        yield sum(2**exp * bit for exp, bit in enumerate(reversed(chunk)))
+    bin_digits = bytes(input_bin).translate(BIN_TO_ASCII_TABLE)
+    # Any trailing partial chunk is decoded into its own (low-order) byte
+    num_full_bytes, tail_len = divmod(len(bin_digits), 8)
+    full_bytes_len = num_full_bytes * 8
+
+    if num_full_bytes:
+        value = int(bin_digits[:full_bytes_len], 2).to_bytes(num_full_bytes, "big")
+    else:
+        value = b""
+
+    if tail_len:
+        return value + bytes((int(bin_digits[full_bytes_len:], 2),))
+    else:
+        return value
 
 
-@apply_to_return_value(bytes)
 def encode_to_bin(value):
     """
     ASCII -> 0100000101010111010000110100100101001001
     """
-    for char in value:
-        for exp in EXP:
-            if char & exp:
-                yield True
-            else:
-                yield False
+    return b"".join(map(BYTE_TO_BIN_LOOKUP.__getitem__, value))
 
 
 def encode_from_bin_keypath(input_bin):
@@ -40,6 +44,7 @@ def encode_from_bin_keypath(input_bin):
     Encodes a sequence of 0s and 1s into tightly packed bytes
     Used in encoding key path of a KV-NODE
     """
+    input_bin = bytes(input_bin)
     padded_bin = bytes((4 - len(input_bin)) % 4) + input_bin
     prefix = TWO_BITS[len(input_bin) % 4]
     if len(padded_bin) % 8 == 4:
@@ -54,8 +59,8 @@ def decode_to_bin_keypath(path):
     Used in decoding key path of a KV-NODE
     """
     path = encode_to_bin(path)
-    if path[0] == 1:
-        path = path[4:]
-    assert path[0:2] == PREFIX_00
-    padded_len = TWO_BITS.index(path[2:4])
-    return path[4 + ((4 - padded_len) % 4) :]
+    # Find where the 00 prefix starts, instead of re-slicing the whole path
+    offset = 4 if path[0] == 1 else 0
+    assert path[offset : offset + 2] == PREFIX_00
+    padded_len = TWO_BITS.index(path[offset + 2 : offset + 4])
+    return path[offset + 4 + ((4 - padded_len) % 4) :]
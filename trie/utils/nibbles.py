@@ -3,9 +3,6 @@ import itertools
 from eth_utils import (
     to_tuple,
 )
-from eth_utils.toolz import (
-    partition,
-)
 
 from trie.constants import (
     HP_FLAG_0,
@@ -19,16 +16,26 @@ from trie.exceptions import (
 NIBBLES_LOOKUPS = {byte: (byte >> 4, byte & 15) for byte in range(256)}
 
 
-def _bytes_to_nibbles(value):
-    """
-    Convert a byte string to nibbles
-    """
-    for byte in value:
-        yield from NIBBLES_LOOKUPS[byte]
+HEX_CHAR_TO_NIBBLE = {
+    hex_char: nibble for nibble, hex_char in enumerate("0123456789abcdef")
+}
 
 
 def bytes_to_nibbles(value):
-    return tuple(_bytes_to_nibbles(value))
+    """
+    Convert a byte string to nibbles
+
+    Each hex digit of a byte string is one of its nibbles, so let hex() split
+    the bytes in C and only look up the value of each digit in Python.
+    """
+    if isinstance(value, bytes):
+        # Some bytes subclasses (like older HexBytes) override hex() to add a 0x
+        #   prefix, so call the plain bytes version
+        hex_digits = bytes.hex(value)
+    else:
+        # bytearray, memoryview, etc.
+        hex_digits = value.hex()
+    return tuple(map(HEX_CHAR_TO_NIBBLE.__getitem__, hex_digits))
 
 
 VALID_NIBBLES = set(range(16))
@@ -36,7 +43,7 @@ REVERSE_NIBBLES_LOOKUP = {value: key for key, value in NIBBLES_LOOKUPS.items()}
 
 
 def nibbles_to_bytes(nibbles):
-    if any(nibble not in VALID_NIBBLES for nibble in nibbles):
+    if not VALID_NIBBLES.issuperset(nibbles):
         raise InvalidNibbles(
             "Nibbles contained invalid value.  Must be constrained between [0, 15]"
         )
@@ -44,8 +51,9 @@ def nibbles_to_bytes(nibbles):
     if len(nibbles) % 2:
         raise InvalidNibbles("Nibbles must be even in length")
 
-    value = bytes(REVERSE_NIBBLES_LOOKUP[pair] for pair in partition(2, nibbles))
-    return value
+    # pack each pair of nibbles back into a byte
+    nibbles_iter = iter(nibbles)
+    return bytes((high << 4) | low for high, low in zip(nibbles_iter, nibbles_iter))
 
 
 def is_nibbles_terminated(nibbles):
@@ -66,37 +74,41 @@ def remove_nibbles_terminator(nibbles):
     return nibbles
 
 
-def encode_nibbles(nibbles):
+def encode_hex_prefix(raw_nibbles, is_leaf):
     """
-    The Hex Prefix function
+    Hex Prefix encode nibbles that do not carry a terminator, packing the flag
+    and each pair of nibbles straight into bytes.
     """
-    if is_nibbles_terminated(nibbles):
-        flag = HP_FLAG_2
-    else:
-        flag = HP_FLAG_0
-
-    raw_nibbles = remove_nibbles_terminator(nibbles)
+    if not VALID_NIBBLES.issuperset(raw_nibbles):
+        raise InvalidNibbles(
+            "Nibbles contained invalid value.  Must be constrained between [0, 15]"
+        )
 
     is_odd = len(raw_nibbles) % 2
+    flag = (HP_FLAG_2 if is_leaf else HP_FLAG_0) + is_odd
 
+    nibbles_iter = iter(raw_nibbles)
     if is_odd:
-        flagged_nibbles = tuple(
-            itertools.chain(
-                (flag + 1,),
-                raw_nibbles,
-            )
-        )
+        first_byte = (flag << 4) | next(nibbles_iter)
     else:
-        flagged_nibbles = tuple(
-            itertools.chain(
-                (flag, 0),
-                raw_nibbles,
-            )
+        first_byte = flag << 4
+
+    return bytes(
+        itertools.chain(
+            (first_byte,),
+            ((high << 4) | low for high, low in zip(nibbles_iter, nibbles_iter)),
         )
+    )
 
-    prefixed_value = nibbles_to_bytes(flagged_nibbles)
 
-    return prefixed_value
+def encode_nibbles(nibbles):
+    """
+    The Hex Prefix function
+    """
+    if is_nibbles_terminated(nibbles):
+        return encode_hex_prefix(nibbles[:-1], is_leaf=True)
+    else:
+        return encode_hex_prefix(nibbles, is_leaf=False)
 
 
 def decode_nibbles(value):
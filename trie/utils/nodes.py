@@ -33,13 +33,16 @@ from trie.validation import (
 )
 
 from .nibbles import (
-    add_nibbles_terminator,
     decode_nibbles,
+    encode_hex_prefix,
     encode_nibbles,
     is_nibbles_terminated,
     remove_nibbles_terminator,
 )
 
+# Nibbles are immutable, so every branch node can share the same one-nibble segments
+_BRANCH_SUB_SEGMENTS = tuple(Nibbles((nibble,)) for nibble in range(16))
+
 
 def get_node_type(node):
     if node == BLANK_NODE:
@@ -97,7 +100,10 @@ def extract_key(node):
 
 
 def compute_leaf_key(nibbles):
-    return encode_nibbles(add_nibbles_terminator(nibbles))
+    if is_nibbles_terminated(nibbles):
+        return encode_hex_prefix(nibbles[:-1], is_leaf=True)
+    else:
+        return encode_hex_prefix(nibbles, is_leaf=True)
 
 
 def compute_extension_key(nibbles):
@@ -105,10 +111,34 @@ def compute_extension_key(nibbles):
 
 
 def get_common_prefix_length(left_key, right_key):
-    for idx, (left_nibble, right_nibble) in enumerate(zip(left_key, right_key)):
-        if left_nibble != right_nibble:
+    if isinstance(left_key, bytes) and isinstance(right_key, bytes):
+        return _get_common_bytes_prefix_length(left_key, right_key)
+
+    # Most keys diverge within their first two nibbles, so compare those before
+    #   paying to set up a loop
+    shorter_length = min(len(left_key), len(right_key))
+    if shorter_length == 0 or left_key[0] != right_key[0]:
+        return 0
+    elif shorter_length == 1 or left_key[1] != right_key[1]:
+        return 1
+
+    for idx in range(2, shorter_length):
+        if left_key[idx] != right_key[idx]:
             return idx
-    return min(len(left_key), len(right_key))
+    return shorter_length
+
+
+def _get_common_bytes_prefix_length(left_key, right_key):
+    """
+    Compare bytes keys (like the bit paths of a binary trie) as two big integers,
+    so that the first differing byte is found in one XOR instead of a python loop.
+    """
+    length = min(len(left_key), len(right_key))
+    diff = int.from_bytes(left_key[:length], "big") ^ int.from_bytes(
+        right_key[:length], "big"
+    )
+    # The highest set bit of the XOR is in the first byte that differs
+    return length - (diff.bit_length() + 7) // 8
 
 
 def consume_common_prefix(left_key, right_key):
@@ -202,7 +232,9 @@ def annotate_node(node_body: RawHexaryNode) -> HexaryTrieNode:
         )
     elif node_type == NODE_TYPE_BRANCH:
         sub_segments = tuple(
-            Nibbles((nibble,)) for nibble in range(16) if bool(node_body[nibble])
+            _BRANCH_SUB_SEGMENTS[nibble]
+            for nibble in range(16)
+            if bool(node_body[nibble])
         )
         return HexaryTrieNode(
             sub_segments=sub_segments,